@@ -0,0 +1,108 @@
+# app/backfill.py — 전체 회차(1 ~ 최신) 이어받기 가능한 수집 파이프라인
+#   python -m app.backfill [--start 1] [--end N] [--concurrency 4] [--rate 5] [--batch 50]
+from __future__ import annotations
+import argparse, asyncio, json, os, time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app import upstream
+from app.locator import locate_latest
+from app.store import STORE
+
+CHECKPOINT_KEY = "backfill"
+
+class TokenBucket:
+    """초당 rate개, 최대 burst개까지 누적되는 토큰 버킷(비동기)."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = max(rate, 1e-6)
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._ts = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._ts) * self.rate)
+                self._ts = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+async def backfill(start: int = 1, end: Optional[int] = None, concurrency: int = 4,
+                   rate: float = 5.0, batch: int = 50,
+                   probe: Callable[[int], Awaitable[Optional[dict]]] = upstream.fetch_draw,
+                   log: Callable[[str], None] = lambda s: None) -> Dict[str, object]:
+    """
+    이미 저장된 회차는 건너뛰고, 제한된 동시성 + 토큰 버킷 속도로 수집해 batch 단위로 저장.
+    진행 상황은 meta 테이블(backfill)에 체크포인트(회차와 같은 트랜잭션). end 없이 다시 실행하면
+    끝나지 않은 이전 실행의 범위를 이어받음(최신 회차 재탐색 생략, 실패 회차는 다시 시도).
+    """
+    t0 = time.monotonic()
+    prev = checkpoint()
+    if end is None and prev and not prev.get("done") and prev.get("start") == start:
+        end = int(prev["end"])
+        log(f"resuming backfill {start}..{end} ({prev.get('fetched', 0)} fetched before)")
+    if end is None:
+        end = (await locate_latest(probe, known=STORE.latest()))["draw_no"]
+    have = set(STORE.nos())
+    todo = [n for n in range(max(1, start), end + 1) if n not in have]
+    cp = {"start": start, "end": end, "remaining": len(todo), "fetched": 0, "failed": [], "done": False}
+    STORE.set_meta(CHECKPOINT_KEY, cp)
+    log(f"backfill {start}..{end}: {len(todo)} missing, {len(have)} stored")
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for n in todo: queue.put_nowait(n)
+    bucket = TokenBucket(rate)
+    buf: List[dict] = []
+    failed: List[int] = []
+    fetched = 0
+
+    def flush() -> None:
+        nonlocal fetched
+        if not buf: return
+        fetched += len(buf)
+        cp.update(remaining=len(todo) - fetched - len(failed), fetched=fetched, failed=failed[-100:])
+        STORE.put_many(buf, meta={CHECKPOINT_KEY: cp})
+        buf.clear()
+        log(f"  saved {fetched}/{len(todo)}")
+
+    async def worker() -> None:
+        while True:
+            try: no = queue.get_nowait()
+            except asyncio.QueueEmpty: return
+            await bucket.acquire()
+            d = None
+            try: d = await probe(no)
+            except Exception: pass
+            if d: buf.append(d)
+            else: failed.append(no)
+            if len(buf) >= batch: flush()
+
+    try:
+        await asyncio.gather(*[worker() for _ in range(max(1, concurrency))])
+    finally:
+        flush()   # 중단/취소되어도 받은 만큼은 저장
+    cp.update(done=not failed, seconds=round(time.monotonic() - t0, 2))
+    STORE.set_meta(CHECKPOINT_KEY, cp)
+    return cp
+
+def checkpoint() -> Optional[dict]:
+    return STORE.get_meta(CHECKPOINT_KEY)
+
+async def _main(args: argparse.Namespace) -> dict:
+    try:
+        return await backfill(args.start, args.end, args.concurrency, args.rate, args.batch, log=print)
+    finally:
+        await upstream.shutdown()
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="동행복권 전체 회차 백필")
+    ap.add_argument("--start", type=int, default=1)
+    ap.add_argument("--end", type=int, default=None, help="기본: 최신 회차 자동 탐색")
+    ap.add_argument("--concurrency", type=int, default=int(os.getenv("BACKFILL_CONCURRENCY", "4")))
+    ap.add_argument("--rate", type=float, default=float(os.getenv("BACKFILL_RATE", "5")), help="초당 요청 수")
+    ap.add_argument("--batch", type=int, default=50)
+    print(json.dumps(asyncio.run(_main(ap.parse_args())), ensure_ascii=False))
@@ -0,0 +1,136 @@
+# app/backtest.py — 워크포워드 백테스트: 각 회차를 직전 window 회차만으로 예측해 적중 집계
+#   python -m app.backtest [--windows 10,30,60,120] [--seeds 0] [--families main,logic] [--workers 4]
+from __future__ import annotations
+import argparse, json, os, random, time
+from concurrent.futures import ProcessPoolExecutor
+from math import comb
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.drawtable import DrawTable
+from app.logic import _gen_candidates_array
+from app.sampling import sample_pool_array
+from app.scoring import score_batch, top_k, LOGIC_ADJ, MAIN_ADJ
+from app.simulate import mp_context
+
+# family별 전략 이름: main = make_strategy_result(표본 80개 → 상위 5), logic = compute_all(가중 후보 → 상위 5)
+STRATEGIES: Dict[str, List[str]] = {
+    "main":  ["보수형", "균형형", "고위험형"],
+    "logic": ["Conservative", "Balanced", "High-Risk"],
+}
+DEFAULT_WINDOWS = (10, 30, 60, 120)
+PICKS = 5
+POOL  = {"main": 80, "logic": 5}
+
+# 무작위 1장 기준 3개 이상 일치 확률(비교용)
+BASELINE_3PLUS = sum(comb(6, k) * comb(39, 6 - k) for k in range(3, 7)) / comb(45, 6)
+
+Job = Tuple[str, str, int, int]      # (family, strategy, window, seed)
+
+def history_arrays(draws) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # (회차 번호, (n,6) 번호, 보너스) — 회차 번호 오름차순. DrawTable이면 열을 그대로 사용
+    if isinstance(draws, DrawTable):
+        return draws.no.copy(), draws.nums.astype(np.int16), draws.bonus.astype(np.int16)
+    items = sorted(draws, key=lambda d: d["draw_no"])
+    nos = np.array([d["draw_no"] for d in items], dtype=np.int32)
+    nums = np.array([d["numbers"] for d in items], dtype=np.int16).reshape(-1, 6)
+    bonus = np.array([int(d.get("bonus", 0) or 0) for d in items], dtype=np.int16)
+    return nos, nums, bonus
+
+def _candidates(family: str, strategy: str, counts: np.ndarray, seed: int, prev_no: int) -> Tuple[np.ndarray, tuple]:
+    freq = {n: int(counts[n - 1]) for n in range(1, 46)}
+    if family == "main":
+        i = STRATEGIES["main"].index(strategy)
+        # make_strategy_result와 같은 seed 규칙(seed=0이면 당시 화면에 나왔을 결과)
+        arr, _ = sample_pool_array(freq, strategy, seed=prev_no * 31 + i * 7 + seed * 1_000_003, size=POOL["main"])
+        return arr, MAIN_ADJ
+    weights = {n: freq[n] + 1 for n in range(1, 46)}
+    rng = random.Random(seed * 1_000_003 + prev_no)
+    return _gen_candidates_array(strategy, POOL["logic"], rng, weights), LOGIC_ADJ
+
+def run_job(job: Job, nos: np.ndarray, nums: np.ndarray, bonus: np.ndarray) -> Dict[str, object]:
+    """한 설정(family, strategy, window, seed)으로 전체 이력 재생."""
+    family, strategy, window, seed = job
+    n = len(nos)
+    hot = np.zeros((n, 46), dtype=np.int8)              # 회차별 당첨 번호 one-hot(인덱스 0 미사용)
+    hot[np.arange(n)[:, None], nums] = 1
+    counts = hot[:window, 1:].sum(axis=0).astype(np.int64)
+    hist = np.zeros(7, dtype=np.int64)
+    five_bonus = tickets = 0
+    for i in range(window, n):
+        if i > window:                                   # 창 이동: 6개 추가, 6개 제거
+            counts += hot[i - 1, 1:]
+            counts -= hot[i - 1 - window, 1:]
+        cands, adj = _candidates(family, strategy, counts, seed, int(nos[i - 1]))
+        if not len(cands): continue
+        _, _, score = score_batch(cands, np.concatenate([[0.0], counts]).astype(np.float64), adj)
+        picks = np.asarray(cands)[top_k(score, PICKS)]
+        hits = hot[i][picks].sum(axis=1)
+        hist += np.bincount(hits, minlength=7)[:7]
+        five_bonus += int(((hits == 5) & (picks == bonus[i]).any(axis=1)).sum())
+        tickets += len(picks)
+    three_plus = int(hist[3:].sum())
+    return {
+        "family": family, "strategy": strategy, "window": window, "seed": seed,
+        "draws": max(0, n - window), "tickets": tickets,
+        "hits": {"3": int(hist[3]), "4": int(hist[4]), "5": int(hist[5]) - five_bonus,
+                 "5+B": five_bonus, "6": int(hist[6])},
+        "rate_3plus": round(three_plus / tickets, 5) if tickets else 0.0,
+        "avg_match": round(float((hist * np.arange(7)).sum()) / tickets, 4) if tickets else 0.0,
+        "baseline_rate_3plus": round(BASELINE_3PLUS, 5),
+    }
+
+def _aggregate(rows: List[dict], key: str) -> Dict[str, dict]:
+    out: Dict[str, dict] = {}
+    for r in rows:
+        a = out.setdefault(str(r[key]), {"tickets": 0, "3plus": 0, "matches": 0.0,
+                                         "hits": {"3": 0, "4": 0, "5": 0, "5+B": 0, "6": 0}})
+        a["tickets"] += r["tickets"]
+        a["3plus"] += sum(r["hits"].values())
+        a["matches"] += r["avg_match"] * r["tickets"]
+        for k, v in r["hits"].items(): a["hits"][k] += v
+    for a in out.values():
+        t = a.pop("tickets") or 1
+        a["rate_3plus"] = round(a.pop("3plus") / t, 5)
+        a["avg_match"] = round(a.pop("matches") / t, 4)
+        a["tickets"] = t
+    return out
+
+def make_jobs(windows: Sequence[int] = DEFAULT_WINDOWS, seeds: Sequence[int] = (0,),
+              families: Sequence[str] = ("main", "logic")) -> List[Job]:
+    return [(f, s, w, seed) for f in families for s in STRATEGIES[f] for w in windows for seed in seeds]
+
+def run_backtest(draws, jobs: Sequence[Job], workers: Optional[int] = None) -> Dict[str, object]:
+    """(strategy, window, seed) 작업을 프로세스 풀로 분산. workers=1이면 현재 프로세스에서 실행."""
+    t0 = time.perf_counter()
+    nos, nums, bonus = history_arrays(draws)
+    jobs = [j for j in jobs if len(nos) > j[2]]
+    workers = workers or min(len(jobs), os.cpu_count() or 1) or 1
+    if workers <= 1 or len(jobs) <= 1:
+        rows = [run_job(j, nos, nums, bonus) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context()) as ex:
+            rows = list(ex.map(run_job, jobs, *([x] * len(jobs) for x in (nos, nums, bonus))))
+    return {
+        "history": {"draws": len(nos), "first": int(nos[0]) if len(nos) else 0,
+                    "last": int(nos[-1]) if len(nos) else 0},
+        "results": rows,
+        "by_strategy": _aggregate(rows, "strategy"),
+        "by_window": _aggregate(rows, "window"),
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+
+def _ints(s: str) -> List[int]:
+    return [int(x) for x in s.split(",") if x.strip()]
+
+if __name__ == "__main__":
+    from app.store import STORE
+    ap = argparse.ArgumentParser(description="전략 워크포워드 백테스트")
+    ap.add_argument("--windows", default=",".join(map(str, DEFAULT_WINDOWS)))
+    ap.add_argument("--seeds", default="0")
+    ap.add_argument("--families", default="main,logic")
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args()
+    jobs = make_jobs(_ints(args.windows), _ints(args.seeds), [f for f in args.families.split(",") if f in STRATEGIES])
+    print(json.dumps(run_backtest(STORE.table, jobs, args.workers), ensure_ascii=False, indent=2))
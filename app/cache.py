@@ -0,0 +1,114 @@
+# app/cache.py — 크기 제한 LRU(프로세스 내). 예측/응답 바이트 캐시 공용
+from __future__ import annotations
+import hashlib, json, threading, time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:          # 선택 의존성: 없으면 표준 json
+    orjson = None
+
+class LRUCache:
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = max(1, maxsize)
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> Any:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        hit = self.get(key, _MISSING)
+        return hit if hit is not _MISSING else self.put(key, build())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+_MISSING = object()
+
+class TTLCache(LRUCache):
+    """
+    LRUCache + 항목별 만료. ttl=None이면 만료 없음(지난 회차처럼 바뀌지 않는 값).
+    만료된 값은 LRU에서 밀려날 때까지 남겨 두고 상류 오류 시 stale로 제공, 부정 항목(없음)은 짧게만.
+    """
+
+    FRESH, STALE, NEGATIVE, MISS = "fresh", "stale", "negative", "miss"
+
+    def __init__(self, maxsize: int = 1024, clock: Callable[[], float] = time.monotonic):
+        super().__init__(maxsize)
+        self._clock = clock
+        self.stale_served = self.negative_hits = 0
+
+    def lookup(self, key: Hashable) -> Tuple[str, Any]:
+        ent = self.get(key, _MISSING)
+        if ent is _MISSING:
+            return self.MISS, None
+        value, expires, negative = ent
+        if expires is not None and self._clock() >= expires:
+            return (self.MISS, None) if negative else (self.STALE, value)
+        if negative:
+            with self._lock: self.negative_hits += 1
+            return self.NEGATIVE, None
+        return self.FRESH, value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> Any:
+        self.put(key, (value, None if ttl is None else self._clock() + ttl, False))
+        return value
+
+    def set_negative(self, key: Hashable, ttl: float) -> None:
+        self.put(key, (None, self._clock() + ttl, True))
+
+    def stale(self, key: Hashable, default: Any = None) -> Any:
+        # 오류 시 폴백: 만료 여부와 무관하게 마지막 양성 값(없으면 default)
+        with self._lock:
+            ent = self._data.get(key)
+        if ent is None or ent[2]:
+            return default
+        with self._lock: self.stale_served += 1
+        return ent[0]
+
+    def stats(self) -> Dict[str, int]:
+        return {**super().stats(), "stale_served": self.stale_served, "negative_hits": self.negative_hits}
+
+# ---- 응답 바이트/ETag 도우미 ----
+def json_bytes(payload: Any) -> bytes:
+    # JSONResponse와 동일한 모양(ensure_ascii=False, 공백 없음). orjson이 있으면 그쪽(정수 키는 문자열로)
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass              # orjson이 모르는 타입 → 표준 json으로
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match: return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
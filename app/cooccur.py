@@ -0,0 +1,142 @@
+# app/cooccur.py — 번호 쌍/세 개 동시 출현 인덱스(회차 추가 시 O(1) 갱신, 구간은 누적합 체크포인트로)
+#   쌍: 990개(45C2) id, 64회차마다 누적 행을 저장 → 구간 빈도 = 체크포인트 차 + 경계 블록(≤64행) 보정
+#   세 개: 14,190개(45C3) id, 회차별 id 20개 + id → 출현 위치 목록(희소)
+from __future__ import annotations
+from bisect import bisect_left
+from itertools import combinations
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+N     = 45
+BLOCK = 64
+
+PAIRS    = np.array(list(combinations(range(1, N + 1), 2)), dtype=np.int16)       # (990, 2)
+TRIPLES  = np.array(list(combinations(range(1, N + 1), 3)), dtype=np.int16)       # (14190, 3)
+PAIR_ID  = np.full((N + 1, N + 1), -1, dtype=np.int16)
+PAIR_ID[PAIRS[:, 0], PAIRS[:, 1]] = np.arange(len(PAIRS))
+TRIPLE_ID = np.full((N + 1, N + 1, N + 1), -1, dtype=np.int16)
+TRIPLE_ID[TRIPLES[:, 0], TRIPLES[:, 1], TRIPLES[:, 2]] = np.arange(len(TRIPLES))
+
+# 6개 중 쌍/세 개 자리 조합
+_I2 = np.array(list(combinations(range(6), 2)), dtype=np.int64)   # (15, 2)
+_I3 = np.array(list(combinations(range(6), 3)), dtype=np.int64)   # (20, 3)
+
+# 무작위 1회차에서 특정 쌍이 함께 나올 확률: C(43,4)/C(45,6) = 1/66
+PAIR_P = 6 * 5 / (N * (N - 1))
+
+def pair_ids(nums: np.ndarray) -> np.ndarray:
+    c = np.sort(np.asarray(nums, dtype=np.int64).reshape(-1, 6), axis=1)
+    return PAIR_ID[c[:, _I2[:, 0]], c[:, _I2[:, 1]]]
+
+def triple_ids(nums: np.ndarray) -> np.ndarray:
+    c = np.sort(np.asarray(nums, dtype=np.int64).reshape(-1, 6), axis=1)
+    return TRIPLE_ID[c[:, _I3[:, 0]], c[:, _I3[:, 1]], c[:, _I3[:, 2]]]
+
+class CoIndex:
+    """회차별 쌍/세 개 id + 블록 누적합. FreqIndex와 같은 extend/bounds 규약."""
+
+    def __init__(self, draws: Iterable[dict] = ()):
+        self._size = 0
+        self._nos = np.zeros(0, dtype=np.int32)
+        self._pid = np.zeros((0, 15), dtype=np.int16)
+        self._tid = np.zeros((0, 20), dtype=np.int16)
+        self._ck  = np.zeros((1, len(PAIRS)), dtype=np.int32)   # _ck[j] = 앞 j*BLOCK개 회차 쌍 빈도
+        self._tpos: Dict[int, List[int]] = {}                   # 세 개 id → 출현 행 위치(오름차순)
+        self.extend(draws)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nos(self) -> np.ndarray:
+        return self._nos[:self._size]
+
+    def _reserve(self, need: int) -> None:
+        cap = len(self._nos)
+        if need <= cap: return
+        cap = max(need, cap * 2, 64)
+        nos = np.zeros(cap, dtype=np.int32); nos[:self._size] = self.nos
+        pid = np.zeros((cap, 15), dtype=np.int16); pid[:self._size] = self._pid[:self._size]
+        tid = np.zeros((cap, 20), dtype=np.int16); tid[:self._size] = self._tid[:self._size]
+        self._nos, self._pid, self._tid = nos, pid, tid
+
+    def extend(self, draws: Iterable[dict]) -> bool:
+        """회차 번호 오름차순으로 덧붙임. 순서가 어긋나면 False(호출측에서 재구성)."""
+        items = list(draws)
+        if not items: return True
+        last = int(self._nos[self._size - 1]) if self._size else 0
+        for d in items:
+            if d["draw_no"] <= last: return False
+            last = d["draw_no"]
+        k, start = len(items), self._size
+        self._reserve(start + k)
+        nums = np.array([d["numbers"] for d in items], dtype=np.int64)
+        self._nos[start:start + k] = [d["draw_no"] for d in items]
+        self._pid[start:start + k] = pair_ids(nums)
+        tids = triple_ids(nums)
+        self._tid[start:start + k] = tids
+        for i, row in enumerate(tids.tolist()):
+            for t in row: self._tpos.setdefault(t, []).append(start + i)
+        self._size += k
+        # 새로 채워진 블록마다 체크포인트 1행
+        full = self._size // BLOCK
+        if full + 1 > len(self._ck):
+            ck = np.zeros((full + 1, len(PAIRS)), dtype=np.int32)
+            ck[:len(self._ck)] = self._ck
+            for j in range(len(self._ck), full + 1):
+                ck[j] = ck[j - 1] + self._block_counts((j - 1) * BLOCK, j * BLOCK)
+            self._ck = ck
+        return True
+
+    def _block_counts(self, lo: int, hi: int) -> np.ndarray:
+        return np.bincount(self._pid[lo:hi].ravel(), minlength=len(PAIRS)).astype(np.int32)
+
+    def _prefix(self, i: int) -> np.ndarray:
+        j = i // BLOCK
+        return self._ck[j] + self._block_counts(j * BLOCK, i)
+
+    def bounds(self, end_no: int, n: int) -> Tuple[int, int]:
+        nos = self.nos
+        lo = int(np.searchsorted(nos, end_no - n + 1, side="left"))
+        hi = int(np.searchsorted(nos, end_no, side="right"))
+        return lo, max(lo, hi)
+
+    # ---- 쌍 ----
+    def pair_counts(self, end_no: int, n: int) -> np.ndarray:
+        """구간 쌍 빈도(길이 990, PAIRS 순서)."""
+        lo, hi = self.bounds(end_no, n)
+        return self._prefix(hi) - self._prefix(lo)
+
+    def pair_matrix(self, end_no: int, n: int) -> np.ndarray:
+        # 대칭 (46,46) 조회표(인덱스 0 미사용) — 채점용
+        m = np.zeros((N + 1, N + 1), dtype=np.float64)
+        c = self.pair_counts(end_no, n)
+        m[PAIRS[:, 0], PAIRS[:, 1]] = c
+        m[PAIRS[:, 1], PAIRS[:, 0]] = c
+        return m
+
+    def top_pairs(self, end_no: int, n: int, k: int = 20) -> List[dict]:
+        lo, hi = self.bounds(end_no, n)
+        c = self._prefix(hi) - self._prefix(lo)
+        expected = (hi - lo) * PAIR_P
+        order = np.lexsort((np.arange(len(c)), -c))[:k]
+        return [{"pair": PAIRS[i].tolist(), "count": int(c[i]),
+                 "lift": round(float(c[i]) / expected, 3) if expected else 0.0} for i in order]
+
+    # ---- 세 개 ----
+    def triple_count(self, nums: Sequence[int], end_no: int, n: int) -> int:
+        a, b, c = sorted(int(x) for x in nums)
+        pos = self._tpos.get(int(TRIPLE_ID[a, b, c]), [])
+        lo, hi = self.bounds(end_no, n)
+        return bisect_left(pos, hi) - bisect_left(pos, lo) if pos else 0
+
+    def top_triples(self, end_no: int, n: int, k: int = 10) -> List[dict]:
+        lo, hi = self.bounds(end_no, n)
+        c = np.bincount(self._tid[lo:hi].ravel(), minlength=len(TRIPLES))
+        order = np.lexsort((np.arange(len(c)), -c))[:k]
+        return [{"triple": TRIPLES[i].tolist(), "count": int(c[i])} for i in order if c[i] > 0]
+
+    def total_triples(self) -> Dict[Tuple[int, int, int], int]:
+        # 전체 이력 희소 표: 한 번 이상 나온 세 개만
+        return {tuple(TRIPLES[t].tolist()): len(p) for t, p in self._tpos.items()}
@@ -0,0 +1,149 @@
+# app/drawtable.py — 회차 기록을 열 단위 배열로(struct of arrays)
+#   회차 번호 int32 / 번호 uint8[6] / 보너스 uint8 / 45비트 마스크 uint64 / 날짜 서수 int32(0 = 없음)
+#   ISO 형식이 아닌 날짜 문자열(예: 자리표시자 '2025-..')만 회차 번호 → 문자열 dict에 따로 보관
+#   구간 슬라이스는 배열 뷰(복사 없음), dict/JSON 모양으로는 응답 직전에만 변환
+from __future__ import annotations
+from datetime import date as _date
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+_BIT = np.uint64(1) << np.arange(46, dtype=np.uint64) >> np.uint64(1)   # _BIT[n] = 1 << (n-1)
+
+def date_ordinal(s) -> int:
+    try: return _date.fromisoformat(str(s)[:10]).toordinal() if s else 0
+    except ValueError: return 0
+
+def ordinal_date(o: int) -> Optional[str]:
+    return _date.fromordinal(int(o)).isoformat() if o > 0 else None
+
+class DrawTable:
+    """회차 번호 오름차순 열 배열. 뒤에 덧붙이기는 용량 2배 확장(분할 상환 O(1))."""
+
+    __slots__ = ("_size", "_no", "_nums", "_bonus", "_mask", "_day", "_rawdate")
+
+    def __init__(self, draws: Iterable[dict] = ()):
+        self._size = 0
+        self._no    = np.zeros(0, dtype=np.int32)
+        self._nums  = np.zeros((0, 6), dtype=np.uint8)
+        self._bonus = np.zeros(0, dtype=np.uint8)
+        self._mask  = np.zeros(0, dtype=np.uint64)
+        self._day   = np.zeros(0, dtype=np.int32)
+        self._rawdate: Dict[int, str] = {}
+        self.extend(draws)
+
+    @classmethod
+    def _view(cls, src: "DrawTable", lo: int, hi: int) -> "DrawTable":
+        t = cls.__new__(cls)
+        t._size = hi - lo
+        t._no, t._nums, t._bonus = src._no[lo:hi], src._nums[lo:hi], src._bonus[lo:hi]
+        t._mask, t._day, t._rawdate = src._mask[lo:hi], src._day[lo:hi], src._rawdate
+        return t
+
+    def __len__(self) -> int:
+        return self._size
+
+    # ---- 열(읽기 전용으로 취급) ----
+    @property
+    def no(self) -> np.ndarray:
+        return self._no[:self._size]
+
+    @property
+    def nums(self) -> np.ndarray:
+        return self._nums[:self._size]
+
+    @property
+    def bonus(self) -> np.ndarray:
+        return self._bonus[:self._size]
+
+    @property
+    def mask(self) -> np.ndarray:
+        return self._mask[:self._size]
+
+    @property
+    def day(self) -> np.ndarray:
+        return self._day[:self._size]
+
+    # ---- 쓰기 ----
+    def _reserve(self, need: int) -> None:
+        cap = len(self._no)
+        if need <= cap: return
+        cap = max(need, cap * 2, 64)
+        def grow(a: np.ndarray) -> np.ndarray:
+            out = np.zeros((cap,) + a.shape[1:], dtype=a.dtype); out[:self._size] = a[:self._size]
+            return out
+        self._no, self._nums, self._bonus = grow(self._no), grow(self._nums), grow(self._bonus)
+        self._mask, self._day = grow(self._mask), grow(self._day)
+
+    def extend(self, draws: Iterable[dict]) -> bool:
+        """회차 번호 오름차순으로 덧붙임. 순서가 어긋나면 False(호출측에서 재구성)."""
+        items = list(draws)
+        if not items: return True
+        last = int(self._no[self._size - 1]) if self._size else 0
+        for d in items:
+            if d["draw_no"] <= last: return False
+            last = d["draw_no"]
+        k, s = len(items), self._size
+        self._reserve(s + k)
+        nums = np.sort(np.array([d["numbers"] for d in items], dtype=np.int64).reshape(k, 6), axis=1)
+        self._no[s:s + k] = [d["draw_no"] for d in items]
+        self._nums[s:s + k] = nums
+        self._bonus[s:s + k] = [int(d.get("bonus", 0) or 0) for d in items]
+        self._mask[s:s + k] = np.bitwise_or.reduce(_BIT[nums], axis=1)
+        days = [date_ordinal(d.get("date")) for d in items]
+        self._day[s:s + k] = days
+        for d, o in zip(items, days):
+            if d.get("date") and ordinal_date(o) != d["date"]: self._rawdate[d["draw_no"]] = d["date"]
+        self._size += k
+        return True
+
+    # ---- 조회 ----
+    def find(self, no: int) -> int:
+        # 회차 번호 → 행 위치(없으면 -1)
+        i = int(np.searchsorted(self.no, no))
+        return i if i < self._size and self._no[i] == no else -1
+
+    def bounds(self, start: int, end: int) -> Tuple[int, int]:
+        no = self.no
+        lo = int(np.searchsorted(no, start, side="left"))
+        hi = int(np.searchsorted(no, end, side="right"))
+        return lo, max(lo, hi)
+
+    def slice(self, start: int, end: int) -> "DrawTable":
+        """회차 번호 구간 [start, end]의 뷰(복사 없음)."""
+        return DrawTable._view(self, *self.bounds(start, end))
+
+    def take(self, lo: int, hi: int) -> "DrawTable":
+        # 행 위치 [lo, hi) 뷰
+        lo, hi = max(0, lo), min(self._size, hi)
+        return DrawTable._view(self, lo, max(lo, hi))
+
+    def window(self, end_no: int, n: int) -> "DrawTable":
+        return self.slice(end_no - n + 1, end_no)
+
+    # ---- 응답 경계: 기존 JSON 모양 ----
+    def _date(self, no: int, o: int) -> Optional[str]:
+        raw = self._rawdate.get(no) if self._rawdate else None
+        return raw if raw is not None else ordinal_date(o)
+
+    def row(self, i: int) -> dict:
+        no = int(self._no[i])
+        return {"draw_no": no, "numbers": self._nums[i].tolist(),
+                "bonus": int(self._bonus[i]), "date": self._date(no, int(self._day[i]))}
+
+    def get(self, no: int) -> Optional[dict]:
+        i = self.find(no)
+        return self.row(i) if i >= 0 else None
+
+    def __iter__(self) -> Iterator[dict]:
+        return (self.row(i) for i in range(self._size))
+
+    def to_dicts(self) -> List[dict]:
+        # 열 단위로 한 번에 파이썬 값으로 변환 후 조립
+        nos, nums, bonus = self.no.tolist(), self.nums.tolist(), self.bonus.tolist()
+        days = [self._date(a, o) for a, o in zip(nos, self.day.tolist())]
+        return [{"draw_no": a, "numbers": b, "bonus": c, "date": d} for a, b, c, d in zip(nos, nums, bonus, days)]
+
+    def nbytes(self) -> Dict[str, int]:
+        return {"rows": self._size, "bytes": sum(a[:self._size].nbytes for a in
+                                                  (self._no, self._nums, self._bonus, self._mask, self._day))}
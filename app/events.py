@@ -0,0 +1,97 @@
+# app/events.py — 새 회차 알림 SSE 팬아웃
+#   발행: 이벤트 1건을 SSE 프레임 바이트로 1회 직렬화 → 공용 링 버퍼에 추가 → 대기 중인 구독자 모두 깨움
+#   구독자: 큐 없이 (링 버퍼 + 자기 커서)만 유지 — 유휴 연결은 Condition 대기 코루틴 1개
+#   느린 구독자: 링 버퍼에서 밀려난 이벤트는 건너뛰고 "reset" 이벤트 후 최신부터(발행자는 절대 막히지 않음)
+from __future__ import annotations
+import asyncio, os
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, List, Optional, Tuple
+
+HISTORY   = int(os.getenv("SSE_HISTORY", "32"))        # 재연결(Last-Event-ID) 대비 보관 이벤트 수
+HEARTBEAT = float(os.getenv("SSE_HEARTBEAT_SEC", "15"))
+RETRY_MS  = int(os.getenv("SSE_RETRY_MS", "5000"))
+
+def frame(event_id: int, event: str, data: bytes) -> bytes:
+    # data는 한 줄 JSON(json_bytes) 기준
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, event.encode(), data)
+
+class Broadcaster:
+    """id는 회차 번호(워커/재시작과 무관하게 같은 값) → Last-Event-ID로 이어받기."""
+
+    def __init__(self, history: int = HISTORY):
+        self.history = max(1, history)
+        self._log: Deque[Tuple[int, bytes]] = deque(maxlen=self.history)
+        self._cond: Optional[asyncio.Condition] = None
+        self.clients = 0
+        self.published = 0
+
+    def _condition(self) -> asyncio.Condition:
+        # 이벤트 루프 안에서 처음 쓸 때 생성
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    @property
+    def last_id(self) -> int:
+        return self._log[-1][0] if self._log else 0
+
+    async def publish(self, event_id: int, event: str, data: bytes) -> bool:
+        if event_id <= self.last_id:
+            return False
+        cond = self._condition()
+        async with cond:
+            self._log.append((event_id, frame(event_id, event, data)))
+            self.published += 1
+            cond.notify_all()
+        return True
+
+    def since(self, cursor: int) -> Tuple[List[Tuple[int, bytes]], bool]:
+        # (cursor 이후 이벤트, 빈틈 여부 — cursor 다음 이벤트가 이미 링 버퍼에서 밀려났으면 True)
+        items = [(i, f) for i, f in self._log if i > cursor]
+        gap = bool(self._log) and cursor > 0 and self._log[0][0] > cursor + 1
+        return items, gap
+
+    async def subscribe(self, last_id: Optional[int],
+                        backfill: Optional[Callable[[int, int], List[bytes]]] = None,
+                        heartbeat: float = HEARTBEAT) -> AsyncIterator[bytes]:
+        """
+        last_id 없으면 가장 최근 이벤트 1건부터, 있으면 그 이후 전부.
+        재연결 시 링 버퍼보다 오래된 빈틈은 backfill(last_id, 첫 보관 id)로 채움(회차만 담은 가벼운 이벤트).
+        연결 중에 밀려난 경우(느린 구독자)는 "reset" 후 보관된 이벤트부터.
+        """
+        cond = self._condition()
+        self.clients += 1
+        try:
+            yield b"retry: %d\n\n" % RETRY_MS
+            if last_id is None:
+                cursor = self.last_id - 1 if self._log else 0
+            else:
+                cursor = last_id
+                items, gap = self.since(cursor)
+                if gap:
+                    if backfill:
+                        for f in backfill(cursor, items[0][0]): yield f
+                    cursor = items[0][0] - 1
+            while True:
+                items, gap = self.since(cursor)
+                if gap:
+                    yield b"event: reset\ndata: {}\n\n"
+                for i, f in items:
+                    cursor = i
+                    yield f
+                async with cond:
+                    if self.last_id <= cursor:
+                        try:
+                            await asyncio.wait_for(cond.wait(), heartbeat)
+                        except asyncio.TimeoutError:
+                            pass
+                if self.last_id <= cursor:
+                    yield b": ping\n\n"
+        finally:
+            self.clients -= 1
+
+    def stats(self) -> dict:
+        return {"clients": self.clients, "published": self.published, "last_id": self.last_id,
+                "history": len(self._log)}
+
+EVENTS = Broadcaster()
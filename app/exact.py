@@ -0,0 +1,181 @@
+# app/exact.py — C(45,6)=8,145,060 전체 조합에 대한 정확한 상위 k (score_combo 목적함수)
+#   조합표는 위험도(risk) 오름차순으로 정렬해 data/에 저장 → 이후 memmap으로 재사용
+#   score = reward/(1+risk) ≤ max_reward/(1+risk) 이므로, 앞에서부터 청크 단위로 훑다가
+#   상한이 현재 k번째 점수 아래로 내려가면 중단(분기 한정)
+from __future__ import annotations
+import os, threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:          # 비 POSIX: 단일 프로세스로 간주
+    fcntl = None
+
+from app.scoring import MAIN_ADJ, freq_lookup
+
+TOTAL      = 8_145_060
+DATA_DIR   = Path(__file__).resolve().parent.parent / "data"
+COMBO_PATH = DATA_DIR / "combos45_6.npy"        # uint8 (TOTAL, 6), risk 오름차순
+RISK_PATH  = DATA_DIR / "combos45_6_risk.npy"   # float64 (TOTAL,)
+LOCK_PATH  = DATA_DIR / "combos45_6.lock"       # 생성은 프로세스 간 1곳만(나머지는 기다렸다가 memmap)
+CHUNK      = int(os.getenv("EXACT_CHUNK", "262144"))
+
+# 전략별 제약: 허용 번호 / 빈도 순위 구간(상위20·중간15·하위10)별 최소 개수
+#   sample_pool_by_strategy: 보수형 상3+중2+임의1, 균형형 상2+중3+하1, 고위험형 하3+중2+임의1
+#   logic._gen_candidates: Conservative 8~38, High-Risk ≤10 또는 ≥36
+TIER_MIN: Dict[str, Tuple[int, int, int]] = {"보수형": (3, 2, 0), "균형형": (2, 3, 1), "고위험형": (0, 2, 3)}
+ALLOWED: Dict[str, Sequence[int]] = {
+    "Conservative": range(8, 39),
+    "High-Risk": [n for n in range(1, 46) if n <= 10 or n >= 36],
+}
+
+_lock = threading.Lock()
+_table: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+def _all_combos(n: int = 45, k: int = 6) -> np.ndarray:
+    # 사전식 순서 전체 조합(벡터화: 자리마다 가능한 다음 값으로 행을 펼침)
+    arr = np.arange(1, n - k + 2, dtype=np.uint8)[:, None]
+    for pos in range(1, k):
+        hi = n - (k - pos - 1)
+        last = arr[:, -1].astype(np.int64)
+        cnt = hi - last
+        rows = np.repeat(arr, cnt, axis=0)
+        offs = np.arange(int(cnt.sum())) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+        arr = np.hstack([rows, (np.repeat(last + 1, cnt) + offs).astype(np.uint8)[:, None]])
+    return arr
+
+def _risk(c: np.ndarray, adj=MAIN_ADJ) -> np.ndarray:
+    # scoring.score_batch와 같은 식(빈도와 무관한 부분만)
+    w1, w2, coef = adj
+    x = c.astype(np.float64)
+    gaps = np.diff(c.astype(np.int16), axis=1)
+    return x.var(axis=1) / 100.0 + ((gaps == 1).sum(axis=1) * w1 + (gaps == 2).sum(axis=1) * w2) * coef
+
+def build_table(combo_path: Path = COMBO_PATH, risk_path: Path = RISK_PATH) -> None:
+    combos = _all_combos()
+    risk = np.empty(len(combos), dtype=np.float64)
+    for s in range(0, len(combos), 1 << 20):
+        risk[s:s + (1 << 20)] = _risk(combos[s:s + (1 << 20)])
+    order = np.argsort(risk, kind="stable")
+    # 임시 파일에 쓴 뒤 교체(읽는 쪽이 반쯤 쓴 파일을 보지 않도록)
+    for path, arr in ((combo_path, combos[order]), (risk_path, risk[order])):
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+        np.save(tmp, arr)
+        os.replace(tmp, path)
+
+@contextmanager
+def _build_lock():
+    # leader.Lease와 같은 flock, 단 블로킹: 먼저 잡은 워커가 만드는 동안 나머지는 대기
+    if fcntl is None:
+        yield
+        return
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    fd = os.open(str(LOCK_PATH), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        try: fcntl.flock(fd, fcntl.LOCK_UN)
+        finally: os.close(fd)
+
+def _load() -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    if not (COMBO_PATH.exists() and RISK_PATH.exists()):
+        return None
+    combos = np.load(COMBO_PATH, mmap_mode="r")
+    risk = np.load(RISK_PATH, mmap_mode="r")
+    if combos.shape != (TOTAL, 6) or risk.shape != (TOTAL,):
+        return None
+    return combos, risk
+
+def table() -> Tuple[np.ndarray, np.ndarray]:
+    """(조합, 위험도) memmap. 없으면 1회 생성(여러 워커 중 1곳만)."""
+    global _table
+    with _lock:
+        if _table is None:
+            loaded = _load()
+            if loaded is None:
+                with _build_lock():
+                    loaded = _load()         # 기다리는 동안 다른 워커가 만들었으면 그대로 사용
+                    if loaded is None:
+                        build_table()
+                        loaded = _load()
+            _table = loaded
+        return _table
+
+def tiers(freq) -> np.ndarray:
+    # 번호 → 빈도 순위 구간(0 상위 20, 1 중간 15, 2 하위 10), sample_pool_by_strategy와 같은 정렬
+    lut = freq_lookup(freq)
+    ranked = sorted(range(1, 46), key=lambda n: (-lut[n], n))
+    t = np.zeros(46, dtype=np.int8)
+    for i, n in enumerate(ranked):
+        t[n] = 0 if i < 20 else 1 if i < 35 else 2
+    return t
+
+def _max_reward(lut: np.ndarray, ok: np.ndarray, tier: Optional[np.ndarray],
+                tier_min: Optional[Tuple[int, int, int]]) -> float:
+    # 상한: 구간별 최소 개수는 각 구간 빈도 상위에서, 나머지는 남은 허용 번호 중 상위에서
+    nums = [n for n in range(1, 46) if ok[n]]
+    picked: List[int] = []
+    if tier is not None and tier_min:
+        for lvl, need in enumerate(tier_min):
+            picked += sorted((n for n in nums if tier[n] == lvl), key=lambda n: -lut[n])[:need]
+    rest = sorted((n for n in nums if n not in picked), key=lambda n: -lut[n])
+    picked += rest[:max(0, 6 - len(picked))]
+    return float(sum(lut[n] for n in picked)) / 6.0
+
+def top_k_exact(freq, k: int = 5, allowed: Optional[Sequence[int]] = None,
+                tier_min: Optional[Tuple[int, int, int]] = None) -> Dict[str, object]:
+    """
+    반환: {"combos": (k,6) int 배열, "reward", "risk", "score", "scanned"}
+    allowed: 허용 번호 집합, tier_min: (상위, 중간, 하위) 최소 개수
+    """
+    combos, risk = table()
+    lut = freq_lookup(freq)
+    ok = np.ones(46, dtype=bool)
+    if allowed is not None:
+        ok[:] = False
+        ok[list(allowed)] = True
+    ok[0] = False
+    tier = tiers(freq) if tier_min else None
+    max_reward = _max_reward(lut, ok, tier, tier_min)
+
+    best_s = np.zeros(0); best_i = np.zeros(0, dtype=np.int64)
+    kth = -np.inf
+    scanned = 0
+    for s in range(0, TOTAL, CHUNK):
+        if len(best_s) >= k and max_reward / (1.0 + float(risk[s])) < kth:
+            break
+        c = np.asarray(combos[s:s + CHUNK])
+        r = np.asarray(risk[s:s + CHUNK])
+        scanned += len(c)
+        mask = ok[c].all(axis=1)
+        if tier is not None:
+            t = tier[c]
+            for lvl, need in enumerate(tier_min):
+                if need: mask &= (t == lvl).sum(axis=1) >= need
+        idx = np.flatnonzero(mask)
+        if not len(idx): continue
+        score = lut[c[idx]].sum(axis=1) / 6.0 / (1.0 + r[idx])
+        cand_s = np.concatenate([best_s, score])
+        cand_i = np.concatenate([best_i, idx + s])
+        if len(cand_s) > k:
+            keep = np.argpartition(-cand_s, k - 1)[:k]
+            cand_s, cand_i = cand_s[keep], cand_i[keep]
+        best_s, best_i = cand_s, cand_i
+        if len(best_s) >= k: kth = float(best_s.min())
+
+    # 점수 내림차순, 동점은 사전식
+    picked = np.asarray(combos[np.sort(best_i)]) if len(best_i) else np.zeros((0, 6), dtype=np.uint8)
+    rk = np.asarray(risk[np.sort(best_i)]) if len(best_i) else np.zeros(0)
+    rw = lut[picked].sum(axis=1) / 6.0 if len(picked) else np.zeros(0)
+    sc = rw / (1.0 + rk)
+    order = np.lexsort(tuple(picked[:, j] for j in range(5, -1, -1)) + (-sc,)) if len(picked) else []
+    return {"combos": picked[order].astype(int), "reward": rw[order], "risk": rk[order],
+            "score": sc[order], "scanned": scanned}
+
+def strategy_top_k(freq, strategy: str, k: int = 5) -> Dict[str, object]:
+    return top_k_exact(freq, k, allowed=ALLOWED.get(strategy), tier_min=TIER_MIN.get(strategy))
@@ -0,0 +1,46 @@
+# app/export.py — 회차 이력 스트리밍 내보내기(NDJSON/CSV, 선택적 gzip)
+#   DrawTable 뷰(복사 없음)를 CHUNK 행씩 직렬화 → 요청당 메모리는 범위 크기와 무관, 첫 바이트는 첫 청크 직후
+from __future__ import annotations
+import json, zlib
+from typing import Iterator, Optional, Tuple
+
+from app.drawtable import DrawTable
+
+CHUNK   = 256
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+CSV_HEADER = b"draw_no,n1,n2,n3,n4,n5,n6,bonus,date\n"
+
+def page(table: DrawTable, since: int = 0, until: Optional[int] = None, cursor: Optional[int] = None,
+         limit: int = 1000) -> Tuple[DrawTable, Optional[int]]:
+    """
+    [max(since, cursor), until] 구간에서 앞쪽 limit행 뷰와 다음 cursor(다음 페이지 첫 회차 번호, 없으면 None).
+    """
+    start = max(since, cursor or 0)
+    end = until if until is not None else (int(table.no[-1]) if len(table) else 0)
+    view = table.slice(start, end)
+    if len(view) <= limit:
+        return view, None
+    return view.take(0, limit), int(view.no[limit])
+
+def _lines(view: DrawTable, fmt: str) -> Iterator[bytes]:
+    if fmt == "csv":
+        yield CSV_HEADER
+    for lo in range(0, len(view), CHUNK):
+        rows = view.take(lo, lo + CHUNK).to_dicts()
+        if fmt == "csv":
+            yield "".join(f'{d["draw_no"]},{",".join(map(str, d["numbers"]))},{d["bonus"]},{d["date"] or ""}\n'
+                          for d in rows).encode("utf-8")
+        else:
+            yield "".join(json.dumps(d, ensure_ascii=False, separators=(",", ":")) + "\n"
+                          for d in rows).encode("utf-8")
+
+def stream(view: DrawTable, fmt: str = "ndjson", gzip: bool = False, level: int = 6) -> Iterator[bytes]:
+    if not gzip:
+        yield from _lines(view, fmt)
+        return
+    # 청크마다 SYNC_FLUSH: 받는 쪽이 압축 스트림을 바로 풀 수 있게
+    z = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for part in _lines(view, fmt):
+        out = z.compress(part) + z.flush(zlib.Z_SYNC_FLUSH)
+        if out: yield out
+    yield z.flush()
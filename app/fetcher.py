@@ -1,93 +1,76 @@
 from __future__ import annotations
-import asyncio, time
-import httpx
-from typing import Dict, Any, List
+import asyncio, os
+from typing import Dict, Any, List, Optional
 
-API = "https://www.dhlottery.co.kr/common.do?method=getLottoNumber&drwNo={no}"
+from app import upstream
+from app.cache import TTLCache
+from app.locator import locate_latest
 
-# 5분 메모리 캐시 (짧은 타임아웃 + 재시도, 무중단 폴백)
-_TTL = 300
-_cache: dict[str, tuple[float, Any]] = {}
+API = upstream.DH_BASE + "?method=getLottoNumber&drwNo={no}"
 
-def _get_cache(k: str):
-    v = _cache.get(k)
-    if not v: return None
-    ts, data = v
-    if time.time() - ts > _TTL:
-        _cache.pop(k, None)
-        return None
-    return data
+# 크기 제한 LRU + 종류별 TTL (짧은 타임아웃 + 재시도, 무중단 폴백)
+#   발표된 회차: 바뀌지 않으므로 만료 없음 / 최신 회차 번호: LATEST_TTL / 아직 없는 회차: NEG_TTL 동안 재요청 안 함
+#   최근 n회 목록은 따로 캐시하지 않고 회차 항목으로 조립 → (end, n) 조합 수와 무관하게 메모리 상한
+CACHE_SIZE = int(os.getenv("FETCH_CACHE_SIZE", "4096"))
+LATEST_TTL = float(os.getenv("FETCH_LATEST_TTL", "300"))
+NEG_TTL    = float(os.getenv("FETCH_NEG_TTL", "60"))
+_cache = TTLCache(maxsize=CACHE_SIZE)
+_NONE = object()
 
-def _set_cache(k: str, val: Any):
-    _cache[k] = (time.time(), val)
-    return val
+def cache_stats() -> Dict[str, int]:
+    return _cache.stats()
 
-async def _request_json(url: str, client: httpx.AsyncClient, retries: int = 1, timeout: float = 3.0):
-    last_err = None
-    for _ in range(retries + 1):
-        try:
-            r = await client.get(url, timeout=timeout, headers={"User-Agent":"Mozilla/5.0 LottoFetcher"})
-            r.raise_for_status()
-            return r.json()
-        except Exception as e:
-            last_err = e
-            await asyncio.sleep(0.15)
-    # 호출 실패 시 에러를 다시 던지되, 상위에서 캐시/폴백 사용
-    raise last_err
+async def _request_json(url: str, retries: int = 1, timeout: float = 3.0):
+    # 공용 풀 클라이언트 + 공통 재시도/백오프. 호출 실패 시 에러를 다시 던지되, 상위에서 캐시/폴백 사용
+    return await upstream.get_json(url, retries=retries, timeout=timeout)
 
-async def fetch_draw(no: int) -> Dict[str, Any]:
-    key = f"draw:{no}"
-    hit = _get_cache(key)
-    if hit: return hit
-    async with httpx.AsyncClient(http2=True) as client:
-        data = await _request_json(API.format(no=no), client)
+def _parse(data: dict, no: int) -> Dict[str, Any]:
     nums = [data.get(f"drwtNo{i}") for i in range(1,7)]
     nums = [int(x) for x in nums if isinstance(x, int)]
     nums.sort()
-    out = {
+    return {
         "draw_no": int(data.get("drwNo", no)),
         "numbers": nums,
         "bonus": int(data.get("bnusNo", 0)),
         "date": data.get("drwNoDate")
     }
-    return _set_cache(key, out)
+
+async def fetch_draw(no: int) -> Optional[Dict[str, Any]]:
+    """회차 1건. 아직 발표 전이면 None(부정 캐시). 상류 오류는 그대로 던짐."""
+    key = ("draw", no)
+    state, hit = _cache.lookup(key)
+    if state == TTLCache.FRESH: return hit
+    if state == TTLCache.NEGATIVE: return None
+    data = await _request_json(API.format(no=no))
+    if data.get("returnValue") != "success":
+        _cache.set_negative(key, NEG_TTL)
+        return None
+    return _cache.set(key, _parse(data, no))
 
 async def fetch_recent(end_no: int, n: int = 10) -> List[Dict[str, Any]]:
-    key = f"recent:{end_no}:{n}"
-    hit = _get_cache(key)
-    if hit: return hit
     start = max(1, end_no - n + 1)
-    async with httpx.AsyncClient(http2=True) as client:
-        datas = await asyncio.gather(*[
-            _request_json(API.format(no=draw), client) for draw in range(start, end_no + 1)
-        ])
-    items = []
-    for d in datas:
-        nums = [d.get(f"drwtNo{i}") for i in range(1,7)]
-        nums = [int(x) for x in nums if isinstance(x, int)]
-        nums.sort()
-        items.append({
-            "draw_no": int(d.get("drwNo", 0)),
-            "numbers": nums,
-            "bonus": int(d.get("bnusNo", 0)),
-            "date": d.get("drwNoDate")
-        })
+    draws = await asyncio.gather(*[fetch_draw(no) for no in range(start, end_no + 1)])
+    items = [d for d in draws if d]
     items.sort(key=lambda x: x["draw_no"])
-    return _set_cache(key, items)
+    return items
 
 async def latest_draw_no(probe_start: int = 9999) -> int:
-    # 최신 회차를 상단부터 역탐색해서 첫 성공 회차 반환
+    # 달력 기반 예상 회차 확인 + 갤로핑/이진 탐색(probe_start는 상한). 실패 시 직전 값(만료돼도) 사용
     key = "latest_no"
-    hit = _get_cache(key)
-    if hit: return hit
-    no = probe_start
-    async with httpx.AsyncClient(http2=True) as client:
-        while no > 0:
-            try:
-                d = await _request_json(API.format(no=no), client)
-                if d.get("returnValue") == "success":
-                    return _set_cache(key, int(d.get("drwNo", no)))
-            except Exception:
-                pass
-            no -= 1
-    return _set_cache(key, 1)
+    state, hit = _cache.lookup(key)
+    if state == TTLCache.FRESH: return hit
+    errors: List[int] = []
+
+    async def probe(no: int):
+        try: return await fetch_draw(no)
+        except Exception:
+            errors.append(no)    # 탐색기는 오류를 '없음'으로 보므로 따로 기록
+            raise
+
+    res = await locate_latest(probe, cap=probe_start)
+    if errors and not res["draw_no"]:
+        old = _cache.stale(key, _NONE)
+        if old is _NONE: raise RuntimeError("upstream unavailable")
+        return old
+    # 일부 요청이 실패한 결과는 과소추정일 수 있으므로 짧게만 보관
+    return _cache.set(key, res["draw_no"] or 1, ttl=NEG_TTL if errors else LATEST_TTL)
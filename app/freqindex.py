@@ -0,0 +1,84 @@
+# app/freqindex.py — 누적합(prefix-sum) 빈도 인덱스: 임의 구간 빈도 = 두 행의 차
+from __future__ import annotations
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+N = 45
+BUCKETS: List[Tuple[str, int, int]] = [("1-10", 1, 10), ("11-20", 11, 20), ("21-30", 21, 30),
+                                       ("31-40", 31, 40), ("41-45", 41, 45)]
+
+def counts_from_draws(draws: Iterable[dict]) -> np.ndarray:
+    # 번호별 출현 수(길이 45, 인덱스 0 → 번호 1)
+    flat = np.fromiter((n for d in draws for n in d["numbers"]), dtype=np.int64)
+    return np.bincount(flat - 1, minlength=N)[:N] if flat.size else np.zeros(N, dtype=np.int64)
+
+def bucket_counts(counts: np.ndarray) -> Dict[str, Dict[str, int]]:
+    return {label: {str(n): int(counts[n - 1]) for n in range(lo, hi + 1)} for label, lo, hi in BUCKETS}
+
+class FreqIndex:
+    """회차별 uint8[45] 행 + 누적합 행렬. 구간 (end_no, n) 빈도는 O(45)."""
+
+    def __init__(self, draws: Iterable[dict] = ()):
+        self._size = 0
+        self._nos  = np.zeros(0, dtype=np.int32)
+        self._rows = np.zeros((0, N), dtype=np.uint8)
+        self._cum  = np.zeros((1, N), dtype=np.int32)   # _cum[i] = 앞 i개 회차 합
+        self.extend(draws)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nos(self) -> np.ndarray:
+        return self._nos[:self._size]
+
+    @property
+    def rows(self) -> np.ndarray:
+        return self._rows[:self._size]
+
+    def _reserve(self, need: int) -> None:
+        cap = len(self._nos)
+        if need <= cap: return
+        cap = max(need, cap * 2, 64)
+        nos = np.zeros(cap, dtype=np.int32); nos[:self._size] = self.nos
+        rows = np.zeros((cap, N), dtype=np.uint8); rows[:self._size] = self.rows
+        cum = np.zeros((cap + 1, N), dtype=np.int32); cum[:self._size + 1] = self._cum[:self._size + 1]
+        self._nos, self._rows, self._cum = nos, rows, cum
+
+    def extend(self, draws: Iterable[dict]) -> bool:
+        """회차 번호 오름차순으로 뒤에 덧붙임. 순서가 어긋나면 False(호출측에서 재구성)."""
+        items = list(draws)
+        if not items: return True
+        last = int(self._nos[self._size - 1]) if self._size else 0
+        for d in items:
+            if d["draw_no"] <= last: return False
+            last = d["draw_no"]
+        k, start = len(items), self._size
+        self._reserve(start + k)
+        self._nos[start:start + k] = [d["draw_no"] for d in items]
+        idx = np.array([d["numbers"] for d in items], dtype=np.int64) - 1
+        block = self._rows[start:start + k]
+        block[np.arange(k)[:, None], idx] = 1
+        np.cumsum(block, axis=0, dtype=np.int32, out=self._cum[start + 1:start + k + 1])
+        self._cum[start + 1:start + k + 1] += self._cum[start]
+        self._size += k
+        return True
+
+    def bounds(self, end_no: int, n: int) -> Tuple[int, int]:
+        # 회차 번호 구간 [end_no-n+1, end_no] → 행 위치 [lo, hi)
+        nos = self.nos
+        lo = int(np.searchsorted(nos, end_no - n + 1, side="left"))
+        hi = int(np.searchsorted(nos, end_no, side="right"))
+        return lo, max(lo, hi)
+
+    def counts(self, end_no: int, n: int) -> np.ndarray:
+        lo, hi = self.bounds(end_no, n)
+        return self._cum[hi] - self._cum[lo]
+
+    def freq(self, end_no: int, n: int) -> Dict[int, int]:
+        c = self.counts(end_no, n)
+        return {i + 1: int(c[i]) for i in range(N)}
+
+    def range_freq(self, end_no: int, n: int) -> Dict[str, Dict[str, int]]:
+        return bucket_counts(self.counts(end_no, n))
@@ -0,0 +1,83 @@
+# app/leader.py — 워커 간 리더 선출(파일 잠금) + 프로세스 내 single-flight
+from __future__ import annotations
+import asyncio, os, time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:          # 비 POSIX: 단일 프로세스로 간주
+    fcntl = None
+
+from app.storage import DATA_DIR
+
+class Lease:
+    """
+    flock 기반 리더 임대. 잡은 프로세스가 죽으면 OS가 잠금을 풀어 주므로
+    다른 워커가 다음 주기에 이어받음. 잠금은 프로세스가 살아 있는 동안 유지.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None: return True
+        if fcntl is None:
+            self._fd = -1
+            return True
+        fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is None: return
+        if self._fd >= 0:
+            try: fcntl.flock(self._fd, fcntl.LOCK_UN)
+            finally: os.close(self._fd)
+        self._fd = None
+
+LEASE = Lease(DATA_DIR / "refresher.lock")
+
+class SingleFlight:
+    """
+    같은 key의 동시 호출은 진행 중인 1개 작업의 결과를 공유. min_interval 동안은 직전 결과 재사용.
+    min_interval=0이면 결과를 보관하지 않음(끝난 작업의 결과는 호출측 캐시 몫).
+    """
+
+    def __init__(self, min_interval: float = 0.0):
+        self.min_interval = min_interval
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._last: Dict[str, Tuple[float, Any]] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        last = self._last.get(key)
+        if last and time.monotonic() - last[0] < self.min_interval:
+            return last[1]
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(fn())
+            self._inflight[key] = fut
+
+            def _done(f: asyncio.Future, key=key) -> None:
+                self._inflight.pop(key, None)
+                if self.min_interval > 0 and not f.cancelled() and f.exception() is None:
+                    now = time.monotonic()
+                    # 재사용 창이 지난 다른 key의 결과는 버림(key가 많아도 창 안의 것만 남음)
+                    for k in [k for k, (t, _) in self._last.items() if now - t >= self.min_interval]:
+                        del self._last[k]
+                    self._last[key] = (now, f.result())
+            fut.add_done_callback(_done)
+        # 한 호출자가 취소돼도 공유 작업은 계속
+        return await asyncio.shield(fut)
@@ -0,0 +1,72 @@
+# app/locator.py — 달력 기반 최신 회차 추정 + 갤로핑/이진 탐색 확인
+from __future__ import annotations
+import datetime as dt
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# 1회: 2002-12-07(토), 이후 매주 토요일 20:45(KST) 추첨
+ANCHOR_NO   = 1
+ANCHOR_DATE = dt.date(2002, 12, 7)
+KST         = dt.timezone(dt.timedelta(hours=9))
+PUBLISH_LAG = dt.timedelta(hours=21)   # 토요일 21시(KST) 이후를 '발표됨'으로 간주
+
+Probe = Callable[[int], Awaitable[Optional[dict]]]
+
+def _parse_date(s: Any) -> Optional[dt.date]:
+    try: return dt.date.fromisoformat(str(s)[:10])
+    except Exception: return None
+
+def expected_latest(known: Optional[dict] = None, now: Optional[dt.datetime] = None) -> int:
+    """알려진 회차(날짜 포함) 또는 1회 기준으로 경과 주 수를 더해 예상 최신 회차 계산."""
+    base_no, base_date = ANCHOR_NO, ANCHOR_DATE
+    if known and _parse_date(known.get("date")):
+        base_no, base_date = int(known["draw_no"]), _parse_date(known["date"])
+    now = (now or dt.datetime.now(KST)).astimezone(KST)
+    today = (now - PUBLISH_LAG).date()
+    return base_no + max(0, (today - base_date).days // 7)
+
+async def locate_latest(probe: Probe, known: Optional[dict] = None,
+                        cap: Optional[int] = None, now: Optional[dt.datetime] = None) -> Dict[str, Any]:
+    """
+    probe(no) → 회차 dict 또는 None(미발표/실패). '있음'은 최신 회차 이하에서만 참이라고 가정.
+    예상 회차를 1~2회 확인으로 끝내고, 빗나가면 갤로핑 후 경계 이진 탐색 → 요청 수 O(log n).
+    반환: {"draw_no", "draw", "guess", "probes", "seen"} (draw_no=0이면 찾지 못함, seen = 확인된 회차 dict)
+    """
+    seen: Dict[int, Optional[dict]] = {}
+
+    async def has(no: int) -> bool:
+        if no not in seen:
+            try: seen[no] = await probe(no)
+            except Exception: seen[no] = None
+        return seen[no] is not None
+
+    lo = int(known["draw_no"]) if known else 0        # 존재가 확인된 최대 회차
+    # 없음이 확인된(또는 상한) 최소 회차. 기본 상한: 1회 기준 예상치 + 1년
+    hi = (cap if cap else max(lo, expected_latest(None, now)) + 52) + 1
+    guess = min(max(expected_latest(known, now), lo + 1), hi - 1)
+
+    if guess > lo:
+        if await has(guess):
+            lo, step = guess, 1
+            while lo + 1 < hi:                           # 위로 갤로핑
+                nxt = min(lo + step, hi - 1)
+                if await has(nxt):
+                    lo, step = nxt, step * 2
+                else:
+                    hi = nxt
+                    break
+        else:
+            hi, step = guess, 1
+            while hi - step > lo:                        # 아래로 갤로핑
+                nxt = hi - step
+                if await has(nxt):
+                    lo = nxt
+                    break
+                hi, step = nxt, step * 2
+    while hi - lo > 1:                                   # 경계 이진 탐색
+        mid = (lo + hi) // 2
+        if await has(mid): lo = mid
+        else: hi = mid
+
+    draw = seen.get(lo) or (known if known and int(known["draw_no"]) == lo else None)
+    return {"draw_no": lo, "draw": draw, "guess": guess, "probes": len(seen),
+            "seen": {no: d for no, d in seen.items() if d is not None}}
@@ -1,9 +1,13 @@
 
 from __future__ import annotations
 import random
+import numpy as np
 from typing import List, Dict, Tuple
 from collections import Counter
 
+from app.freqindex import counts_from_draws, bucket_counts
+from app.scoring import score_batch, freq_lookup, as_combos, top_k, LOGIC_ADJ
+
 NUM_RANGE = range(1,46)
 
 STRAT_KEYS = ["Conservative","Balanced","High-Risk"]
@@ -13,41 +17,47 @@ def _recent_freq(draws: List[Dict], window:int|None=None)->Counter:
     items = draws
     if window is not None and window>0 and len(items)>window:
         items = items[-window:]
-    cnt = Counter()
-    for d in items:
-        cnt.update(d["numbers"])
-    return cnt
+    c = counts_from_draws(items)
+    return Counter({i + 1: int(v) for i, v in enumerate(c) if v})
 
-def _gen_candidates(strategy: str, count: int, rng: random.Random, weights: Dict[int, float]) -> List[List[int]]:
+_GEN_CHUNK = 65536
+
+def _gen_candidates_array(strategy: str, count: int, rng: random.Random, weights: Dict[int, float]) -> np.ndarray:
+    """
+    가중 비복원 6개 추출을 count개 한 번에: Gumbel-top-k(log w + Gumbel 잡음의 상위 6개)는
+    '가중치 비례로 하나씩 뽑고 제거'와 같은 분포. 같은 seed의 rng면 같은 결과.
+    """
     pool = list(NUM_RANGE)
     if strategy == "Conservative":
         pool = [n for n in pool if 8 <= n <= 38]
     elif strategy == "High-Risk":
         pool = [n for n in pool if n <= 10 or n >= 36]
-    cands = []
-    while len(cands) < count:
-        pick = []
-        available = pool[:]
-        local_w = [weights.get(n, 1.0) for n in available]
-        for _ in range(6):
-            tot = sum(local_w)
-            r = rng.random() * tot
-            acc = 0.0
-            idx = 0
-            for i, w in enumerate(local_w):
-                acc += w
-                if acc >= r:
-                    idx = i
-                    break
-            pick.append(available[idx])
-            available.pop(idx); local_w.pop(idx)
-        pick.sort()
-        cands.append(pick)
-    return cands
-
-def _metrics(nums: List[int], freq: Dict[int,int]):
+    nums = np.array(pool, dtype=np.int16)
+    with np.errstate(divide="ignore"):
+        logw = np.log(np.array([weights.get(n, 1.0) for n in pool], dtype=np.float64))
+    gen = np.random.default_rng(rng.getrandbits(64))
+    out = np.empty((max(0, count), 6), dtype=np.int16)
+    for s in range(0, count, _GEN_CHUNK):
+        m = min(_GEN_CHUNK, count - s)
+        keys = logw + gen.gumbel(size=(m, len(pool)))
+        idx = np.argpartition(-keys, 5, axis=1)[:, :6]
+        out[s:s + m] = np.sort(nums[idx], axis=1)
+    return out
+
+def _gen_candidates(strategy: str, count: int, rng: random.Random, weights: Dict[int, float]) -> List[List[int]]:
+    return _gen_candidates_array(strategy, count, rng, weights).tolist()
+
+def _rationale(nums: List[int], freq: Dict[int,int], total_counts: int, basis: str = "10회") -> str:
+    fvals = [freq.get(n,0) for n in nums]
+    perc = [round((f/total_counts)*100,1) for f in fvals]
+    return " | ".join([f"{n:02d}/{f}/{p}%/{basis}" for n,f,p in zip(nums, fvals, perc)])
+
+def _metrics(nums: List[int], freq: Dict[int,int], pairs=None, pair_weight: float = 0.0):
     fvals = [freq.get(n,0) for n in nums]
     reward = sum(fvals)/len(fvals)
+    if pairs is not None and pair_weight:
+        ps = [pairs[a][b] for i, a in enumerate(nums) for b in nums[i+1:]]
+        reward += pair_weight * sum(ps)/len(ps)
     mean = sum(nums)/len(nums)
     var = sum((x-mean)**2 for x in nums)/len(nums)
     adj = sum(1 for a,b in zip(nums, nums[1:]) if b==a+1)
@@ -55,14 +65,29 @@ def _metrics(nums: List[int], freq: Dict[int,int]):
     score = reward / (1.0 + risk)
     rr = reward / (risk + 1e-6)
     total_counts = sum(freq.values()) or 1
-    perc = [round((freq.get(n,0)/total_counts)*100,1) for n in nums]
-    basis = "10회"
-    details = " | ".join([f"{n:02d}/{f}/{p}%/{basis}" for n,f,p in zip(nums, fvals, perc)])
+    details = _rationale(nums, freq, total_counts)
     win = min(95.0, max(5.0, score*100.0/(reward+1.0)))
     return dict(reward=round(reward,3), risk=round(risk,3), score=round(score,3),
                 rr=round(rr,3), win=round(win,1), rationale=details)
 
-def compute_all(seed:int|None, draws: List[Dict], count:int=5, window:int=10):
+def _metrics_batch(cands, freq: Dict[int,int], top: int, pairs=None, pair_weight: float = 0.0) -> List[Dict]:
+    """_metrics와 같은 값을 (N,6) 배열 전체에 대해 계산, 근거 문자열은 상위 top개만 생성."""
+    arr = as_combos(cands)
+    reward, risk, score = score_batch(arr, freq_lookup(freq), LOGIC_ADJ, pairs, pair_weight)
+    total_counts = sum(freq.values()) or 1
+    out = []
+    for j in top_k(score, top):
+        nums = arr[j].tolist()
+        r, k, s = float(reward[j]), float(risk[j]), float(score[j])
+        out.append(dict(numbers=nums, reward=round(r,3), risk=round(k,3), score=round(s,3),
+                        rr=round(r/(k+1e-6),3), win=round(min(95.0, max(5.0, s*100.0/(r+1.0))),1),
+                        rationale=_rationale(nums, freq, total_counts)))
+    return out
+
+def compute_all(seed:int|None, draws: List[Dict], count:int=5, window:int=10, top:int|None=None,
+                pairs=None, pair_weight: float = 0.0):
+    # top: 전략별로 남길 상위 개수(기본: 후보 전체 = count)
+    # pairs: 쌍 동시 출현 조회표(CoIndex.pair_matrix), pair_weight > 0일 때만 점수에 반영
     recent_cnt = _recent_freq(draws, window)
     weights = {n: (recent_cnt.get(n,0) + 1) for n in range(1,46)}
     rng = random.Random(seed)
@@ -72,12 +97,9 @@ def compute_all(seed:int|None, draws: List[Dict], count:int=5, window:int=10):
     best_key = None; best_score = -1e9
 
     for s in STRAT_KEYS:
-        cands = _gen_candidates(s, count, rng, weights)
-        scored = []
-        for nums in cands:
-            m = _metrics(nums, recent_cnt)
-            scored.append({"name": s, "name_ko": STRAT_KO[s], "numbers": nums, **m})
-        scored.sort(key=lambda x: x["score"], reverse=True)
+        cands = _gen_candidates_array(s, count, rng, weights)
+        scored = [{"name": s, "name_ko": STRAT_KO[s], **m}
+                  for m in _metrics_batch(cands, recent_cnt, top or count, pairs, pair_weight)]
         all_by_strategy[s] = scored
         best_per_strategy[s] = scored[0]
         if scored[0]["score"] > best_score:
@@ -91,17 +113,11 @@ def compute_all(seed:int|None, draws: List[Dict], count:int=5, window:int=10):
                 best_top5=best_top5, best3=best3, all_korean=all_korean)
 
 def range_freq_from_draws(draws: List[Dict]) -> tuple[dict, list[str], str]:
-    from collections import Counter
-    cnt = Counter()
-    for d in draws: cnt.update(d["numbers"])
-    groups = {
-        "1-10": list(range(1,11)),
-        "11-20": list(range(11,21)),
-        "21-30": list(range(21,31)),
-        "31-40": list(range(31,41)),
-        "41-45": list(range(41,46)),
-    }
-    out = {label: {str(n): int(cnt.get(n,0)) for n in nums} for label, nums in groups.items()}
+    return range_freq_from_counts(counts_from_draws(draws))
+
+def range_freq_from_counts(counts) -> tuple[dict, list[str], str]:
+    # counts: 길이 45 빈도 배열(FreqIndex.counts 결과 그대로 사용 가능)
+    out = bucket_counts(counts)
     strengths = {label: sum(v.values()) for label, v in out.items()}
     sorted_groups = sorted(strengths.items(), key=lambda x: x[1], reverse=True)
     top2 = [sorted_groups[0][0], sorted_groups[1][0]] if len(sorted_groups)>=2 else [sorted_groups[0][0]]
@@ -1,35 +1,85 @@
 # app/main.py — Render 안정판 SAFE
 from __future__ import annotations
-import json, os, asyncio, random
+import json, os, asyncio, random, time
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import Awaitable, List, Dict, Set, Tuple, Optional
+from urllib.parse import urlencode
 
-import httpx
-from fastapi import FastAPI, Query
-from fastapi.responses import JSONResponse, HTMLResponse, Response
+import numpy as np
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import JSONResponse, HTMLResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
+
+from app import upstream
+from app.store import STORE
+from app.locator import locate_latest, expected_latest
+from app.backfill import backfill
+from app.leader import LEASE, SingleFlight
+from app.freqindex import counts_from_draws, bucket_counts
+from app import exact, backtest, simulate, export, fetcher, metrics, profiler, prerender
+from app.metrics import stage
+from app.sampling import sample_pool_array
+from app.scoring import score_batch, freq_lookup, top_k
+from app.cache import LRUCache, json_bytes, make_etag, etag_matches
+from app.logic import STRAT_KO
+from app.schemas import PredictRequest, PredictBatchRequest
+from app.events import EVENTS, frame
 
 LIVE_FETCH = os.getenv("LIVE_FETCH", "1")     # "0"이면 절대 외부 호출 안 함
-DH_BASE    = "https://www.dhlottery.co.kr/common.do"
-HEADERS    = {"User-Agent": "lotto-predictor/safe"}
-TIMEOUT    = httpx.Timeout(3.0, connect=2.0, read=2.0)
+DH_BASE    = upstream.DH_BASE
 
 BASE_DIR   = Path(__file__).resolve().parent.parent
 STATIC_DIR = BASE_DIR / "static"
 DATA_DIR   = BASE_DIR / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
-CACHE_PATH = DATA_DIR / "recent.json"
-SEED_PATH  = DATA_DIR / "seed.json"
 
-app = FastAPI(title="Lotto Predictor SAFE")
+# 앱 수명: 공용 HTTP 클라이언트 생성/종료 + 시작 작업
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    await upstream.startup()
+    await on_startup()
+    try:
+        yield
+    finally:
+        for t in list(_tasks): t.cancel()
+        LEASE.release()
+        simulate.shutdown()
+        metrics.remove()
+        await upstream.shutdown()
+
+_tasks: Set[asyncio.Future] = set()   # 실행 중인 백그라운드 작업(끝나면 빠지고, 종료 시 나머지 취소)
+
+def background(aw: Awaitable) -> asyncio.Future:
+    t = asyncio.ensure_future(aw)
+    _tasks.add(t)
+    t.add_done_callback(_tasks.discard)
+    return t
+
+app = FastAPI(title="Lotto Predictor SAFE", lifespan=lifespan)
+# 단계 타이머 → Server-Timing 헤더 + 요청 지연 히스토그램, PROFILE=1이면 느린 요청 프로파일
+app.add_middleware(metrics.TimingMiddleware, profiler=profiler.PROFILER)
 
 # 정적/루트
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
+# 정적 자산은 내용 해시 URL(/assets/app.<해시>.js, 1년 immutable), index.html은 그 URL로 바꿔 1번만 렌더
+#   /static/*는 예전 URL 호환용으로 유지
+ASSETS = prerender.Assets(STATIC_DIR)
+
 @app.get("/", response_class=HTMLResponse)
-async def root():
-    html = STATIC_DIR / "index.html"
-    return html.read_text(encoding="utf-8") if html.exists() else "<h1>index.html not found</h1>"
+async def root(request: Request):
+    return prerender.respond(ASSETS.page(), request.headers.get("accept-encoding"),
+                             request.headers.get("if-none-match"), "no-cache")
+
+@app.get("/assets/{name}")
+async def assets(name: str, request: Request):
+    r = ASSETS.get(name)
+    if r is None:
+        return JSONResponse({"error": "not found"}, status_code=404)
+    return prerender.respond(r, request.headers.get("accept-encoding"),
+                             request.headers.get("if-none-match"), prerender.IMMUTABLE)
 
 # 파비콘 & 헬스
 @app.get("/favicon.ico")
@@ -39,82 +89,118 @@ async def favicon():
 
 @app.get("/healthz")
 async def healthz():
-    return {"ok": True, "live_fetch": LIVE_FETCH}
-
-# 캐시/시드
-def read_cache() -> Dict[str, dict]:
-    if CACHE_PATH.exists():
-        try: return json.loads(CACHE_PATH.read_text(encoding="utf-8"))
-        except Exception: pass
-    if SEED_PATH.exists():
-        try:
-            seed = json.loads(SEED_PATH.read_text(encoding="utf-8"))
-            if isinstance(seed, dict): return seed
-        except Exception: pass
-    return {}
+    return {"ok": True, "live_fetch": LIVE_FETCH, "locate": LAST_LOCATE, "stream": EVENTS.stats(),
+            "fetch_cache": fetcher.cache_stats(), "prerender": _hot.stats()}
+
+# Prometheus 텍스트: 모든 워커 합산(다른 워커 값은 최대 METRICS_FLUSH_SEC 지연)
+@app.get("/metrics")
+async def api_metrics():
+    text = await run_in_threadpool(lambda: metrics.render(metrics.collect()))
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4; charset=utf-8")
 
-def write_cache(cache: Dict[str, dict]) -> None:
-    try: CACHE_PATH.write_text(json.dumps(cache, ensure_ascii=False, indent=2), encoding="utf-8")
-    except Exception: pass
+# 느린 요청 프로파일(PROFILE=1): JSON 목록 또는 format=folded(collapsed 스택, flamegraph 입력)
+@app.get("/debug/profiles")
+async def api_profiles(format: str = Query("json")):
+    if not profiler.ENABLED:
+        return JSONResponse({"error": "profiling disabled (PROFILE=1)"}, status_code=404)
+    if format == "folded":
+        return PlainTextResponse(profiler.PROFILER.folded())
+    return JSONResponse({"profiles": list(profiler.PROFILER.profiles)})
 
-def max_cached_draw(cache: Dict[str, dict]) -> int:
-    try: return max(map(int, cache.keys())) if cache else 0
-    except Exception: return 0
+# 캐시/시드: SQLite(data/draws.sqlite3) 기반 프로세스 내 저장소(STORE)
+def max_cached_draw() -> int:
+    with stage("cache"):
+        return STORE.latest_no()
 
-# 외부 호출(요청 경로에서 강제하지 않음)
+# 외부 호출(요청 경로에서 강제하지 않음): 공용 풀 클라이언트 경유
 async def http_get_json(url, params=None):
     try:
-        async with httpx.AsyncClient(timeout=TIMEOUT, headers=HEADERS) as client:
-            r = await client.get(url, params=params)
-        return r.json() if r.status_code == 200 else None
+        return await upstream.get_json(url, params=params)
     except Exception:
         return None
 
 async def fetch_draw(drw_no: int) -> Optional[dict]:
     if LIVE_FETCH != "1":
         return None
-    data = await http_get_json(DH_BASE, params={"method": "getLottoNumber", "drwNo": str(drw_no)})
-    if not data or str(data.get("returnValue", "")).lower() != "success":
-        return None
-    nums = [data.get(f"drwtNo{i}") for i in range(1, 7)]
-    if None in nums: return None
-    return {
-        "draw_no": int(data["drwNo"]),
-        "numbers": sorted(int(n) for n in nums),
-        "bonus": int(data.get("bnusNo", 0)),
-        "date": data.get("drwNoDate"),
-    }
+    return await upstream.fetch_draw(drw_no)
+
+LAST_LOCATE: Dict[str, int] = {}   # 최근 탐색 결과(예상 회차/확정 회차/요청 수)
 
-async def find_latest_draw_no(cache: Dict[str, dict]) -> int:
-    last = max_cached_draw(cache)
+async def find_latest_draw_no() -> int:
+    last = max_cached_draw()
     if LIVE_FETCH != "1":
         return last
-    if last > 0:
-        # +1~+3 퀵 체크
-        cur = last + 1
-        for _ in range(3):
-            ok = await fetch_draw(cur)
-            if ok:
-                cache[str(ok["draw_no"])] = ok
-                write_cache(cache)
-                return ok["draw_no"]
-            cur += 1
-        return last
-    # 캐시 없음: 앵커 1400부터 하향 20회만
-    anchor = int(os.getenv("LATEST_GUESS", "1400"))
-    for d in range(anchor, max(1, anchor - 20), -1):
-        ok = await fetch_draw(d)
-        if ok:
-            cache[str(ok["draw_no"])] = ok
-            write_cache(cache)
-            return ok["draw_no"]
-    return 0
-
-async def ensure_recent(cache: Dict[str, dict], end_no: int, n: int) -> List[dict]:
-    start = max(1, end_no - n + 1)
-    items = [cache[str(d)] for d in range(start, end_no + 1) if str(d) in cache]
-    items.sort(key=lambda x: x["draw_no"])
-    return items
+    # 저장된 최신 회차(날짜) + 경과 주 수로 예상 → 1~2회 확인, 빗나가면 갤로핑/이진 탐색
+    res = await locate_latest(fetch_draw, known=STORE.latest())
+    found = res["draw_no"]
+    LAST_LOCATE.update(guess=res["guess"], found=found, probes=res["probes"])
+    if found > last:
+        await fill_gap(last, found, res["seen"])
+    return max(last, found)
+
+# 저장된 최신 ~ 찾은 최신 사이 회차를 모두 저장(찾은 회차만 넣으면 중간이 영구히 빔)
+#   탐색 중 받은 회차는 재사용, 남은 회차가 GAP_FILL_MAX 이하면 바로 받고, 넘으면 백필 작업으로 넘김
+GAP_FILL_MAX = int(os.getenv("GAP_FILL_MAX", "52"))
+_gap_task: Optional[asyncio.Future] = None
+
+def _contiguous(last: int, found: int, got: Dict[int, dict]) -> List[dict]:
+    # last 다음부터 끊기지 않은 회차만(중간 삽입은 전체 재구성을 부르고, 빈틈은 다음 주기에 이어서)
+    run: List[dict] = []
+    for no in range(last + 1, found + 1):
+        if no not in got: break
+        run.append(got[no])
+    return run
+
+async def fill_gap(last: int, found: int, seen: Dict[int, dict]) -> None:
+    global _gap_task
+    if last <= 0:
+        # 빈 저장소: 최신 1건만(전체 수집은 BACKFILL/백필 CLI)
+        if seen.get(found): STORE.put(seen[found])
+        return
+    missing = [no for no in range(last + 1, found + 1) if no not in seen]
+    if len(missing) > GAP_FILL_MAX:
+        run = _contiguous(last, found, seen)
+        if run: STORE.put_many(run)
+        if _gap_task is None or _gap_task.done():   # 이미 도는 백필이 있으면 다시 걸지 않음
+            _gap_task = background(backfill(start=last + 1, end=found))
+        return
+    got = dict(seen)
+    for no, d in zip(missing, await asyncio.gather(*(fetch_draw(no) for no in missing))):
+        if d: got[no] = d
+    run = _contiguous(last, found, got)
+    if run: STORE.put_many(run)
+
+# 동시 호출 1회로 합치고, 직전 결과는 PROBE_MIN_SEC 동안 재사용
+_flight = SingleFlight(min_interval=float(os.getenv("PROBE_MIN_SEC", "30")))
+
+async def probe_latest() -> int:
+    return await _flight.do("latest", find_latest_draw_no)
+
+# stale-while-revalidate: 마지막 재검증 시각 + 백그라운드 재검증 1개만 유지
+FRESH_SEC = float(os.getenv("LATEST_FRESH_SEC", "60"))
+_checked: Dict[str, float] = {"at": 0.0}
+_revalidating: List[asyncio.Task] = []
+
+async def revalidate() -> None:
+    # 리더는 상류 탐색, 나머지 워커는 DB 변경만 확인
+    try:
+        if LIVE_FETCH == "1" and LEASE.try_acquire():
+            await probe_latest()
+        else:
+            STORE.refresh()
+        _checked["at"] = time.time()
+        await announce()
+    except Exception:
+        pass
+
+def schedule_revalidate() -> None:
+    if _revalidating and not _revalidating[0].done():
+        return
+    _revalidating[:] = [asyncio.create_task(revalidate())]
+
+def ensure_recent(end_no: int, n: int) -> List[dict]:
+    with stage("cache"):
+        return STORE.window(end_no, n)
 
 # 구간/빈도
 def range_buckets() -> List[Tuple[str, range]]:
@@ -122,26 +208,23 @@ def range_buckets() -> List[Tuple[str, range]]:
             ("31-40", range(31,41)), ("41-45", range(41,46))]
 
 def compute_range_freq(items: List[dict]) -> dict:
-    per = {k: {str(n): 0 for n in bucket} for k, bucket in range_buckets()}
-    for it in items:
-        for n in it["numbers"]:
-            for k, bucket in range_buckets():
-                if n in bucket:
-                    per[k][str(n)] += 1
-                    break
-    return {"per": per}
+    return {"per": bucket_counts(counts_from_draws(items))}
 
 # 예측/점수
+#   PAIR_WEIGHT > 0이면 reward에 쌍 친화도(창 안 동시 출현 수) 항을 더함(기본 0 = 기존 점수 그대로)
+PAIR_WEIGHT = float(os.getenv("PAIR_WEIGHT", "0"))
+
 def build_freq(items: List[dict]) -> Dict[int, int]:
-    freq = {i: 0 for i in range(1, 46)}
-    for it in items:
-        for n in it["numbers"]:
-            freq[n] += 1
-    return freq
+    c = counts_from_draws(items)
+    return {i: int(c[i - 1]) for i in range(1, 46)}
 
-def score_combo(nums: List[int], freq: Dict[int, int]) -> tuple[float, float, float]:
+def score_combo(nums: List[int], freq: Dict[int, int],
+                pairs=None, pair_weight: float = 0.0) -> tuple[float, float, float]:
     nums = sorted(nums)
     reward = sum(freq[n] for n in nums) / 6.0
+    if pairs is not None and pair_weight:
+        # 쌍 친화도: 15개 쌍의 평균 동시 출현 수
+        reward += pair_weight * sum(pairs[a][b] for i, a in enumerate(nums) for b in nums[i+1:]) / 15.0
     mean = sum(nums) / 6.0
     variance = sum((n - mean) ** 2 for n in nums) / 6.0
     adjacency_penalty = sum(1.0 if b-a==1 else 0.5 if b-a==2 else 0.0 for a,b in zip(nums, nums[1:]))
@@ -149,30 +232,44 @@ def score_combo(nums: List[int], freq: Dict[int, int]) -> tuple[float, float, fl
     score = reward / (1.0 + risk)
     return reward, risk, score
 
-def sample_pool_by_strategy(freq: Dict[int, int], strategy: str, seed: int) -> List[List[int]]:
-    rnd = random.Random(seed)
-    items = sorted(freq.items(), key=lambda x: (-x[1], x[0]))
-    top = [n for n,_ in items[:20]]
-    mid = [n for n,_ in items[20:35]]
-    low = [n for n,_ in items[35:]]
-
-    pool: set[tuple[int,...]] = set()
-    tries = 0
-    while len(pool) < 80 and tries < 2000:
-        tries += 1
-        if strategy == "보수형":
-            picks = rnd.sample(top,3) + rnd.sample(mid,2) + rnd.sample(range(1,46),1)
-        elif strategy == "균형형":
-            picks = rnd.sample(top,2) + rnd.sample(mid,3) + rnd.sample(low,1)
-        else:
-            picks = rnd.sample(low,3) + rnd.sample(mid,2) + rnd.sample(range(1,46),1)
-        picks = sorted(set(picks))[:6]
-        if len(picks) == 6 and 1 <= min(picks) <= 45 and 1 <= max(picks) <= 45:
-            pool.add(tuple(picks))
-    return [list(t) for t in pool]
-
-def make_strategy_result(items: List[dict], latest_draw: int) -> dict:
-    if not items:
+def sample_pool_by_strategy(freq: Dict[int, int], strategy: str, seed: int, size: int = 80) -> List[List[int]]:
+    return sample_pool_array(freq, strategy, seed, size)[0].tolist()
+
+def pack_pick(name: str, nums: List[int], reward: float, risk: float, score: float) -> dict:
+    return {
+        "name": name, "name_ko": name, "numbers": nums,
+        "reward": round(reward,3), "risk": round(risk,3),
+        "score": round(score,3), "rr": round(score,3),
+        "win": round(min(85.0, 20 + reward*1.5 - risk*10), 1),
+    }
+
+def rank_strategies(out_all: Dict[str, List[dict]], order: List[str]) -> dict:
+    all_pool = [x for name in order for x in out_all[name]]
+    all_pool.sort(key=lambda x: x["score"], reverse=True)
+    best3 = [out_all[name][0] for name in order if out_all[name]]
+    best3.sort(key=lambda x: x["score"], reverse=True)
+    return {
+        "best3_by_priority_korean": best3[:3],
+        "all_by_strategy_korean": out_all,
+        "best_strategy_top5": all_pool[:5],
+    }
+
+def make_exact_result(freq: Dict[int, int], k: int = 5) -> dict:
+    # 표본 추출 대신 전체 C(45,6) 조합에서 전략 제약을 만족하는 정확한 상위 k
+    order = ["보수형","균형형","고위험형"]
+    out_all: Dict[str, List[dict]] = {}
+    for name in order:
+        res = exact.strategy_top_k(freq, name, k)
+        out_all[name] = [pack_pick(name, res["combos"][j].tolist(), float(res["reward"][j]),
+                                   float(res["risk"][j]), float(res["score"][j]))
+                         for j in range(len(res["combos"]))]
+    return rank_strategies(out_all, order)
+
+def make_strategy_result(items: Optional[List[dict]], latest_draw: int,
+                         freq: Optional[Dict[int, int]] = None, pairs=None) -> dict:
+    if freq is None:
+        freq = build_freq(items or [])
+    if not any(freq.values()):
         # 빈 화면 방지용 기본 결과(균등 가중)
         rnd = random.Random(777)
         def pick6(): return sorted(rnd.sample(range(1,46), 6))
@@ -188,102 +285,434 @@ def make_strategy_result(items: List[dict], latest_draw: int) -> dict:
             "all_by_strategy_korean": res,
             "best_strategy_top5": pool
         }
-    freq  = build_freq(items)
     order = ["보수형","균형형","고위험형"]
     out_all: Dict[str, List[dict]] = {}
-    all_pool = []
+    lut   = freq_lookup(freq)
     for i, name in enumerate(order):
-        combos = sample_pool_by_strategy(freq, name, seed=latest_draw * 31 + i * 7)
-        scored = []
-        for nums in combos:
-            reward, risk, score = score_combo(nums, freq)
-            scored.append({
-                "name": name, "name_ko": name, "numbers": nums,
-                "reward": round(reward,3), "risk": round(risk,3),
-                "score": round(score,3), "rr": round(score,3),
-                "win": round(min(85.0, 20 + reward*1.5 - risk*10), 1),
-            })
-        scored.sort(key=lambda x: x["score"], reverse=True)
+        with stage("candidates"):
+            arr, _ = sample_pool_array(freq, name, seed=latest_draw * 31 + i * 7)
+        if not len(arr):
+            out_all[name] = []
+            continue
+        with stage("score"):
+            reward, risk, score = score_batch(arr, lut, pairs=pairs, pair_weight=PAIR_WEIGHT)
+            # 점수는 후보 전체를 한 번에, 응답 dict는 상위 5개만 생성
+            scored = [pack_pick(name, arr[j].tolist(), float(reward[j]), float(risk[j]), float(score[j]))
+                      for j in top_k(score, 5)]
         out_all[name] = scored[:5]
-        all_pool += scored[:5]
-    all_pool.sort(key=lambda x: x["score"], reverse=True)
-    best3 = [out_all[name][0] for name in order if out_all[name]]
-    best3.sort(key=lambda x: x["score"], reverse=True)
-    return {
-        "best3_by_priority_korean": best3[:3],
-        "all_by_strategy_korean": out_all,
-        "best_strategy_top5": all_pool[:5],
-    }
+    return rank_strategies(out_all, order)
 
 # ---- API: 항상 200 ----
 @app.get("/api/latest")
 async def api_latest():
-    cache = read_cache()
-    latest = max_cached_draw(cache)
-    # 빠른 최신화(비차단): 실패 무시
-    try:
-        newest = await find_latest_draw_no(cache)
-        if newest > 0 and newest != latest:
-            latest = newest
-            write_cache(cache)
-    except Exception:
-        pass
-    if latest <= 0 or str(latest) not in cache:
-        return JSONResponse({"draw_no": 0, "numbers": [1,2,3,4,5,6], "bonus": 7, "date": None})
-    return JSONResponse(cache[str(latest)])
+    # 항상 로컬 저장소에서 즉시 응답, 신선도 창을 넘었으면 백그라운드 재검증만 예약
+    with stage("cache"):
+        draw = STORE.latest()
+    checked = _checked["at"]
+    age = time.time() - checked if checked else None
+    stale = (age is None or age > FRESH_SEC
+             or (draw is not None and expected_latest(draw) > draw["draw_no"]))
+    if stale:
+        schedule_revalidate()
+    meta = {"stale": stale, "age": round(age, 1) if age is not None else None}
+    # 회차 부분은 미리 만든 바이트, 요청마다 달라지는 stale/age만 뒤에 이어 붙임
+    head = hot_latest().body
+    with stage("serialize"):
+        return Response(content=head[:-1] + b"," + json_bytes(meta)[1:], media_type="application/json")
 
 @app.get("/api/dhlottery/recent")
-async def api_recent(end_no: int = Query(...), n: int = Query(10)):
-    cache = read_cache()
-    have = sorted(map(int, cache.keys()))
-    if not have:
+async def api_recent(request: Request, end_no: int = Query(...), n: int = Query(10)):
+    end = STORE.resolve_end(end_no)
+    if end <= 0:
         return JSONResponse({"items": []})
-    end   = end_no if end_no in have else have[-1]
-    start = max(have[0], end - n + 1)
-    items = [cache[str(d)] for d in range(start, end + 1) if str(d) in cache]
-    items.sort(key=lambda x: x["draw_no"])
-    return JSONResponse({"items": items})
+    if end == max_cached_draw() and n in HOT_WINDOWS:
+        return prerender.respond(hot_recent(end, n), request.headers.get("accept-encoding"),
+                                 request.headers.get("if-none-match"))
+    # 대량 조회는 /api/export/draws(스트리밍, 페이지)로
+    return JSONResponse({"items": ensure_recent(end, min(n, EXPORT_PAGE_MAX))})
+
+# 이력 내보내기: NDJSON/CSV 스트리밍, since/until(회차 번호), cursor(다음 페이지 첫 회차), limit ≤ EXPORT_PAGE_MAX
+#   다음 페이지는 X-Next-Cursor / Link 헤더로
+EXPORT_PAGE_MAX = int(os.getenv("EXPORT_PAGE_MAX", "5000"))
+
+@app.get("/api/export/draws")
+async def api_export_draws(request: Request, format: str = Query("ndjson"), since: int = Query(0, ge=0),
+                           until: Optional[int] = Query(None, ge=0), cursor: Optional[int] = Query(None, ge=0),
+                           limit: int = Query(1000, ge=1)):
+    if format not in export.FORMATS:
+        return JSONResponse({"error": "format must be ndjson or csv"}, status_code=400)
+    view, nxt = export.page(STORE.table, since, until, cursor, min(limit, EXPORT_PAGE_MAX))
+    acc = prerender.accepted(request.headers.get("accept-encoding"))
+    gz = acc.get("gzip", acc.get("*", 0.0)) > 0
+    headers = {"Vary": "Accept-Encoding", "X-Row-Count": str(len(view)), "Cache-Control": "no-cache"}
+    if gz: headers["Content-Encoding"] = "gzip"
+    if format == "csv": headers["Content-Disposition"] = 'attachment; filename="draws.csv"'
+    if nxt is not None:
+        q = dict(request.query_params); q["cursor"] = str(nxt)
+        headers["X-Next-Cursor"] = str(nxt)
+        headers["Link"] = f'<{request.url.path}?{urlencode(q)}>; rel="next"'
+    return StreamingResponse(export.stream(view, format, gz), media_type=export.FORMATS[format], headers=headers)
 
 @app.get("/api/range_freq_by_end")
-async def api_range_freq_by_end(end_no: int = Query(...), n: int = Query(10)):
-    cache = read_cache()
-    have = sorted(map(int, cache.keys()))
-    if not have:
+async def api_range_freq_by_end(request: Request, end_no: int = Query(...), n: int = Query(10)):
+    end = STORE.resolve_end(end_no)
+    if end <= 0:
         per = {k: {str(x): 0 for x in bucket} for k, bucket in range_buckets()}
         return JSONResponse({"per": per})
-    end   = end_no if end_no in have else have[-1]
-    start = max(have[0], end - n + 1)
-    items = [cache[str(d)] for d in range(start, end + 1) if str(d) in cache]
-    return JSONResponse(compute_range_freq(items))
+    if end == max_cached_draw() and n in HOT_WINDOWS:
+        return prerender.respond(hot_range_freq(end, n), request.headers.get("accept-encoding"),
+                                 request.headers.get("if-none-match"))
+    with stage("freq"):
+        per = STORE.index.range_freq(end, n)
+    with stage("serialize"):
+        return JSONResponse({"per": per})
 
 # 예측: GET/POST 허용
+#   결과는 (데이터 버전, 창 크기, 전략 파라미터)에 대해 결정적 → 직렬화 바이트 + 강한 ETag를 LRU에 보관
+PREDICT_WINDOW  = 60
+PREDICT_PARAMS  = ("v1", 80, 5, PAIR_WEIGHT)   # 전략 파라미터(풀 크기/상위 개수/쌍 가중치) 바뀌면 키도 바뀜
+PREDICT_MAX_AGE = int(os.getenv("PREDICT_MAX_AGE", "60"))
+_predict_cache  = LRUCache(maxsize=int(os.getenv("PREDICT_CACHE_SIZE", "64")))
+
+def predict_payload(window: int = PREDICT_WINDOW) -> Tuple[bytes, str]:
+    latest = max_cached_draw()
+    key = (STORE.version, latest, window, PREDICT_PARAMS)
+    def build() -> Tuple[bytes, str]:
+        with stage("freq"):
+            freq = STORE.index.freq(latest, window) if latest > 0 else None
+            pairs = STORE.cooc.pair_matrix(latest, window) if latest > 0 and PAIR_WEIGHT else None
+        res = make_strategy_result(None, latest_draw=latest or 1000, freq=freq, pairs=pairs)
+        with stage("serialize"):
+            body = json_bytes(res)
+            return body, make_etag(body)
+    with stage("cache"):
+        hit = _predict_cache.get(key)
+    return hit if hit is not None else _predict_cache.put(key, build())
+
+# 미리 만든 JSON 응답(원본 + gzip/brotli): 데이터 버전별로 1번, 새 회차(announce)·시작 시 미리 채움
+#   최신 회차, 최신 기준 PRERENDER_WINDOWS 창의 최근 목록/구간 빈도, 기본 예측
+HOT_WINDOWS = tuple(int(x) for x in os.getenv("PRERENDER_WINDOWS", "10").split(",") if x.strip())
+LATEST_DEFAULT = {"draw_no": 0, "numbers": [1,2,3,4,5,6], "bonus": 7, "date": None}
+_hot = prerender.HotCache()
+
+def _serialized(payload) -> bytes:
+    with stage("serialize"):
+        return json_bytes(payload)
+
+def hot_latest() -> prerender.Rendered:
+    return _hot.get(STORE.version, "latest", lambda: _serialized(STORE.latest() or LATEST_DEFAULT))
+
+def hot_recent(end: int, n: int) -> prerender.Rendered:
+    return _hot.get(STORE.version, ("recent", end, n), lambda: _serialized({"items": ensure_recent(end, n)}))
+
+def hot_range_freq(end: int, n: int) -> prerender.Rendered:
+    return _hot.get(STORE.version, ("range_freq", end, n),
+                    lambda: _serialized({"per": STORE.index.range_freq(end, n)}))
+
+def hot_predict() -> prerender.Rendered:
+    max_cached_draw()
+    return _hot.get(STORE.version, "predict", lambda: predict_payload()[0])
+
+def warm_hot() -> None:
+    latest = max_cached_draw()
+    hot_latest()
+    hot_predict()
+    if latest > 0:
+        for n in HOT_WINDOWS:
+            hot_recent(latest, n); hot_range_freq(latest, n)
+
 @app.post("/api/predict")
 @app.get("/api/predict")
-async def api_predict():
-    cache  = read_cache()
-    latest = max_cached_draw(cache)
-    items: List[dict] = []
-    if latest > 0:
-        start = max(1, latest - 59)
-        items = [cache[str(d)] for d in range(start, latest + 1) if str(d) in cache]
-    payload = make_strategy_result(items, latest_draw=latest or 1000)
-    return JSONResponse(payload)
+async def api_predict(request: Request, window: int = Query(PREDICT_WINDOW, ge=1, le=5000)):
+    if window == PREDICT_WINDOW:
+        return prerender.respond(hot_predict(), request.headers.get("accept-encoding"),
+                                 request.headers.get("if-none-match"), f"public, max-age={PREDICT_MAX_AGE}")
+    body, etag = predict_payload(window)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={PREDICT_MAX_AGE}"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/api/predict/exact")
+async def api_predict_exact(request: Request, window: int = Query(PREDICT_WINDOW, ge=1, le=5000),
+                            k: int = Query(5, ge=1, le=100)):
+    latest = max_cached_draw()
+    key = (STORE.version, latest, window, k, "exact")
+    def build() -> Tuple[bytes, str]:
+        freq = STORE.index.freq(latest, window) if latest > 0 else {n: 0 for n in range(1, 46)}
+        body = json_bytes({**make_exact_result(freq, k), "exact": True, "window": window})
+        return body, make_etag(body)
+    hit = _predict_cache.get(key)
+    body, etag = hit if hit else _predict_cache.put(key, await run_in_threadpool(build))
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={PREDICT_MAX_AGE}"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# 배치 예측: 창 크기별 빈도/쌍 표 1회, (창, 전략, seed)별 표본 1회, 창·가중 방식별 채점 1회
+STRAT_ORDER = ["보수형","균형형","고위험형"]
+
+def _batch_config(c: PredictRequest) -> Tuple[int, int, int, Tuple[str, ...], str, float]:
+    names = {STRAT_KO.get(x, x) for x in (c.strategies or STRAT_ORDER)}
+    pw = float(c.pair_weight) if c.weighting == "pairs" else 0.0
+    return (c.window, int(c.seed or 0), min(max(c.count, 1), 80),
+            tuple(n for n in STRAT_ORDER if n in names), c.weighting, pw)
+
+def _batch_key(cfg) -> str:
+    window, seed, count, names, weighting, pw = cfg
+    key = f"window={window}&seed={seed}&count={count}&strategies={','.join(names)}&weighting={weighting}"
+    return key + (f"&pair_weight={pw:g}" if weighting == "pairs" else "")
+
+def predict_batch(configs: List[PredictRequest]) -> dict:
+    latest = max_cached_draw()
+    base = latest or 1000
+    cfgs = [_batch_config(c) for c in configs]
+    results: Dict[str, dict] = {}
+    windows: Dict[int, list] = {}
+    for cfg in cfgs:
+        windows.setdefault(cfg[0], []).append(cfg)
+    scored = 0
+    for window, group in windows.items():
+        with stage("freq"):
+            freq = STORE.index.freq(latest, window) if latest > 0 else {n: 0 for n in range(1, 46)}
+        if not any(freq.values()):
+            fallback = make_strategy_result(None, latest_draw=base, freq=freq)
+            for cfg in group: results[_batch_key(cfg)] = fallback
+            continue
+        lut = freq_lookup(freq)
+        with stage("freq"):
+            pairs = STORE.cooc.pair_matrix(latest, window) if any(cfg[5] for cfg in group) else None
+        # 표본: 같은 (전략, seed)는 1번만 — seed 규칙은 /api/predict·백테스트와 같음(seed 0 = 기본)
+        spans: Dict[Tuple[str, int], Tuple[int, int]] = {}
+        parts: List[np.ndarray] = []
+        off = 0
+        for cfg in group:
+            for name in cfg[3]:
+                if (name, cfg[1]) in spans: continue
+                i = STRAT_ORDER.index(name)
+                with stage("candidates"):
+                    arr, _ = sample_pool_array(freq, name, seed=base * 31 + i * 7 + cfg[1] * 1_000_003)
+                spans[(name, cfg[1])] = (off, off + len(arr))
+                parts.append(arr); off += len(arr)
+        allc = np.concatenate(parts) if parts else np.zeros((0, 6), dtype=np.int16)
+        with stage("score"):
+            by_pw = {pw: score_batch(allc, lut, pairs=pairs, pair_weight=pw) for pw in {cfg[5] for cfg in group}}
+        scored += len(allc) * len(by_pw)
+        for cfg in group:
+            reward, risk, score = by_pw[cfg[5]]
+            out_all: Dict[str, List[dict]] = {}
+            for name in cfg[3]:
+                lo, hi = spans[(name, cfg[1])]
+                out_all[name] = [pack_pick(name, allc[lo + j].tolist(), float(reward[lo + j]),
+                                           float(risk[lo + j]), float(score[lo + j]))
+                                 for j in top_k(score[lo:hi], cfg[2])]
+            results[_batch_key(cfg)] = rank_strategies(out_all, list(cfg[3]))
+    return {"latest_draw": latest, "windows": len(windows), "scored": scored, "results": results}
+
+@app.post("/api/predict/batch")
+async def api_predict_batch(req: PredictBatchRequest):
+    unknown = sorted({x for c in req.configs for x in (c.strategies or []) if STRAT_KO.get(x, x) not in STRAT_ORDER})
+    if unknown:
+        return JSONResponse({"error": f"unknown strategies: {', '.join(unknown)}",
+                             "allowed": STRAT_ORDER + list(STRAT_KO)}, status_code=400)
+    key = (STORE.version, max_cached_draw(), PREDICT_PARAMS, "batch", tuple(map(_batch_config, req.configs)))
+    body = _predict_cache.get(key)
+    if body is None:
+        def build() -> bytes:
+            res = predict_batch(req.configs)
+            with stage("serialize"):
+                return json_bytes(res)
+        body = _predict_cache.put(key, await run_in_threadpool(build))
+    return Response(content=body, media_type="application/json",
+                    headers={"Cache-Control": f"public, max-age={PREDICT_MAX_AGE}"})
+
+# 동시 출현: 메모리 인덱스(CoIndex)만 사용 — 회차 목록을 훑지 않음
+@app.get("/api/cooccurrence")
+async def api_cooccurrence(end_no: int = Query(0), n: int = Query(PREDICT_WINDOW, ge=1, le=5000),
+                           k: int = Query(20, ge=1, le=990), triples: int = Query(10, ge=0, le=100),
+                           heatmap: int = Query(1)):
+    end = STORE.resolve_end(end_no) if end_no > 0 else max_cached_draw()
+    co = STORE.cooc
+    lo, hi = co.bounds(end, n) if end > 0 else (0, 0)
+    out = {"end_no": end, "n": n, "draws": hi - lo,
+           "top_pairs": co.top_pairs(end, n, k) if end > 0 else [],
+           "top_triples": co.top_triples(end, n, triples) if end > 0 and triples else []}
+    if heatmap:
+        # 45×45 대칭 행렬(행/열 = 번호 1..45)
+        m = co.pair_matrix(end, n) if end > 0 else np.zeros((46, 46))
+        out["heatmap"] = m[1:, 1:].astype(int).tolist()
+    return JSONResponse(out)
+
+# 새 회차 스트림(SSE): 갱신 루프가 새 회차를 감지하면 회차 + 빈도 + 예측을 1번 직렬화해 모든 구독자에게
+#   이벤트 id = 회차 번호(Last-Event-ID 헤더로 이어받기), 유휴 시 SSE_HEARTBEAT_SEC마다 주석 ping
+SSE_MAX_CLIENTS = int(os.getenv("SSE_MAX_CLIENTS", "10000"))
+
+def draw_event(d: dict, full: bool) -> bytes:
+    if not full:
+        return json_bytes({"draw": d})
+    no = d["draw_no"]
+    body, _ = predict_payload()
+    # 예측은 캐시된 바이트를 그대로 끼워 넣음(재직렬화 없음)
+    head = json_bytes({"draw": d, "window": PREDICT_WINDOW, "freq": STORE.index.freq(no, PREDICT_WINDOW)})
+    return head[:-1] + b',"prediction":' + body + b"}"
+
+async def announce() -> None:
+    warm_hot()                  # 데이터가 바뀌었으면 자주 쓰는 응답 바이트를 미리 다시 만듦
+    latest = STORE.latest_no()
+    last = EVENTS.last_id
+    if latest <= last: return
+    # 여러 회차가 한꺼번에 들어오면 사이 회차는 회차만, 최신 회차는 전체 페이로드로
+    start = max(last + 1, latest - EVENTS.history + 1) if last else latest
+    for d in STORE.range(start, latest):
+        await EVENTS.publish(d["draw_no"], "draw", draw_event(d, d["draw_no"] == latest))
+
+def _backfill_frames(after: int, before: int) -> List[bytes]:
+    return [frame(d["draw_no"], "draw", draw_event(d, False)) for d in STORE.range(after + 1, before - 1)]
+
+@app.get("/api/stream/draws")
+async def api_stream_draws(request: Request):
+    raw = request.headers.get("last-event-id") or request.query_params.get("last_event_id")
+    try:
+        last_id = int(raw) if raw else None
+    except ValueError:
+        last_id = None
+    if EVENTS.clients >= SSE_MAX_CLIENTS:
+        return JSONResponse({"error": "too many streams"}, status_code=503, headers={"Retry-After": "30"})
+    return StreamingResponse(EVENTS.subscribe(last_id, _backfill_frames), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# 백테스트: 결과는 (데이터 버전, 설정)별로 캐시, 같은 설정 동시 요청은 계산 1회 공유
+_backtest_cache  = LRUCache(maxsize=8)
+_backtest_flight = SingleFlight()
+# 설정마다 프로세스 풀(최대 CPU 수)을 띄우므로 동시에 도는 백테스트 수를 제한(대기 요청은 줄 서서 기다림)
+BACKTEST_CONCURRENCY = int(os.getenv("BACKTEST_CONCURRENCY", "1"))
+_backtest_slots = asyncio.Semaphore(max(1, BACKTEST_CONCURRENCY))
+
+async def _run_backtest(draws, jobs) -> dict:
+    async with _backtest_slots:
+        return await run_in_threadpool(backtest.run_backtest, draws, jobs)
+
+@app.get("/api/backtest")
+async def api_backtest(windows: str = Query("10,30,60,120"), seeds: str = Query("0"),
+                       families: str = Query("main,logic")):
+    try:
+        ws = sorted({min(max(int(x), 1), 1000) for x in windows.split(",") if x.strip()})[:8]
+        ss = sorted({int(x) for x in seeds.split(",") if x.strip()})[:4]
+        if any(x < 0 for x in ss): raise ValueError
+    except ValueError:
+        return JSONResponse({"error": "windows/seeds must be comma-separated integers (seeds >= 0)"}, status_code=400)
+    fams = [f for f in families.split(",") if f in backtest.STRATEGIES]
+    jobs = backtest.make_jobs(ws, ss, fams)
+    key = (STORE.version, max_cached_draw(), tuple(jobs))
+    body = _backtest_cache.get(key)
+    if body is None:
+        draws = STORE.table
+        res = await _backtest_flight.do(repr(key), lambda: _run_backtest(draws, jobs))
+        body = _backtest_cache.put(key, json_bytes(res))
+    return Response(content=body, media_type="application/json",
+                    headers={"Cache-Control": f"public, max-age={PREDICT_MAX_AGE}"})
+
+# 몬테카를로 일치 분포: 조합별 결과를 (조합, 모델, 데이터 버전, 표본 수, seed)로 캐시
+#   numbers 생략 시 현재 추천 상위 5개(best_strategy_top5)
+SIM_MAX_SAMPLES = int(os.getenv("SIM_MAX_SAMPLES", "20000000"))
+SIM_TIME_LIMIT  = float(os.getenv("SIM_TIME_LIMIT", "10"))
+_sim_cache  = LRUCache(maxsize=int(os.getenv("SIM_CACHE_SIZE", "256")))
+_sim_flight = SingleFlight()
+
+@app.get("/api/simulate")
+async def api_simulate(numbers: Optional[str] = Query(None), model: str = Query("uniform"),
+                       window: int = Query(PREDICT_WINDOW, ge=1, le=5000),
+                       samples: int = Query(1_000_000, ge=1), seed: int = Query(0, ge=0),
+                       time_limit: float = Query(SIM_TIME_LIMIT, gt=0)):
+    if model not in ("uniform", "frequency"):
+        return JSONResponse({"error": "model must be uniform or frequency"}, status_code=400)
+    try:
+        if numbers:
+            combos = [sorted({int(x) for x in part.split("-")}) for part in numbers.split(",") if part.strip()]
+        else:
+            combos = [p["numbers"] for p in json.loads(predict_payload(window)[0])["best_strategy_top5"]]
+    except ValueError:
+        return JSONResponse({"error": "numbers: 1-2-3-4-5-6,7-8-9-10-11-12"}, status_code=400)
+    if not combos or any(len(c) != 6 or c[0] < 1 or c[-1] > 45 for c in combos):
+        return JSONResponse({"error": "each combo needs 6 distinct numbers in 1..45"}, status_code=400)
+    combos = combos[:20]
+    samples = min(samples, SIM_MAX_SAMPLES)
+    time_limit = min(time_limit, SIM_TIME_LIMIT)
+
+    latest = max_cached_draw()
+    # 균등 모델은 데이터와 무관
+    data_key = (STORE.version, latest, window) if model == "frequency" else None
+    keys = [(simulate.to_mask(c), model, data_key, samples, seed) for c in combos]
+    rows = [_sim_cache.get(k) for k in keys]
+    todo = [c for c, r in zip(combos, rows) if r is None]
+    meta = {"samples": samples, "requested": samples, "seconds": 0.0, "comparisons_per_sec": 0, "truncated": False}
+    if todo:
+        weights = None
+        if model == "frequency":
+            freq = STORE.index.freq(latest, window) if latest > 0 else {n: 0 for n in range(1, 46)}
+            weights = np.array([freq[n] + 1 for n in range(1, 46)], dtype=np.float64)
+        res = await _sim_flight.do(repr((keys, time_limit)), lambda: run_in_threadpool(
+            simulate.simulate, todo, samples, weights, seed, time_limit))
+        meta = {k: v for k, v in res.items() if k not in ("results", "model")}
+        fresh = {tuple(r["numbers"]): {**r, "samples": res["samples"]} for r in res["results"]}
+        for i, c in enumerate(combos):
+            if rows[i] is None:
+                rows[i] = fresh[tuple(c)]
+                if not res["truncated"]:       # 시간 제한으로 잘린 결과는 캐시하지 않음
+                    _sim_cache.put(keys[i], rows[i])
+    return JSONResponse({"model": model, "window": window if model == "frequency" else None,
+                         **meta, "cached": len(combos) - len(todo), "results": rows})
 
 # 시작 시 비차단 백그라운드(요청과 분리)
-@app.on_event("startup")
+#   리더(파일 잠금 보유) 워커 1개만 상류를 폴링/백필, 나머지는 DB 변경(data_version)만 감지
+REFRESH_SEC = float(os.getenv("REFRESH_SEC", "300"))
+WATCH_SEC   = float(os.getenv("WATCH_SEC", "30"))
+
+async def refresher():
+    backfilled = False
+    while True:
+        t0 = time.perf_counter()
+        try:
+            if LEASE.try_acquire():
+                await probe_latest()
+                _checked["at"] = time.time()
+                if os.getenv("BACKFILL", "0") == "1" and not backfilled:
+                    # 전체 회차 백필(선택): 저장된 회차는 건너뛰므로 재시작 시 이어서 진행
+                    backfilled = True
+                    background(backfill(
+                        concurrency=int(os.getenv("BACKFILL_CONCURRENCY", "4")),
+                        rate=float(os.getenv("BACKFILL_RATE", "5"))))
+            else:
+                STORE.refresh()
+                _checked["at"] = time.time()
+            await announce()
+        except Exception:
+            pass
+        metrics.refresh_cycle(time.perf_counter() - t0)
+        await asyncio.sleep(REFRESH_SEC if LEASE.held else min(REFRESH_SEC, 30.0))
+
+async def watcher():
+    # LIVE_FETCH=0: 상류 호출 없이 DB 변경(백필 CLI 등)만 감지해 구독자에게 알림
+    while True:
+        t0 = time.perf_counter()
+        try:
+            STORE.refresh()
+            await announce()
+        except Exception:
+            pass
+        metrics.refresh_cycle(time.perf_counter() - t0)
+        await asyncio.sleep(WATCH_SEC)
+
 async def on_startup():
-    cache = read_cache()
-    if cache and not CACHE_PATH.exists():
-        write_cache(cache)
-    if LIVE_FETCH == "1":
-        async def refresher():
-            local = read_cache()
-            while True:
-                try:
-                    newest = await find_latest_draw_no(local)
-                    if newest > 0:
-                        write_cache(local)
-                except Exception:
-                    pass
-                await asyncio.sleep(300)
-        asyncio.create_task(refresher())
+    STORE.refresh(force=True)   # DB 연결 + 이전 JSON 이관(최초 1회)
+    ASSETS.load()               # 정적 자산 해시/압축 + index.html 렌더
+    # 전체 조합표 memmap 준비(최초 1회 생성은 수 초 → 스레드에서)
+    if os.getenv("EXACT_WARM", "1") == "1":
+        background(run_in_threadpool(exact.table))
+    await announce()            # 현재 최신 회차를 스트림 첫 이벤트로
+    for name, c in (("predict", _predict_cache), ("backtest", _backtest_cache), ("simulate", _sim_cache)):
+        metrics.register_cache(name, c.stats)
+    metrics.register_cache("fetch", fetcher.cache_stats)
+    if metrics.ENABLED:
+        background(metrics.flusher())
+    background(refresher() if LIVE_FETCH == "1" else watcher())
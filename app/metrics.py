@@ -0,0 +1,308 @@
+# app/metrics.py — 단계별 타이머 + Server-Timing 헤더 + Prometheus 텍스트(/metrics)
+#   단계: with stage("freq"): ... → 요청 문맥(contextvar)에 (이름, 초) 기록 + 단계 히스토그램에 관측
+#   워커 간 합산: 워커마다 METRICS_FLUSH_SEC마다 자기 스냅샷을 METRICS_DIR/<pid>.json으로 원자적 교체,
+#     /metrics는 자기 값(실시간) + 다른 워커 파일을 합침. 죽은 워커의 카운터/히스토그램은 _dead.json에 접어 넣어
+#     합계가 줄지 않게(게이지는 살아 있는 워커만)
+#   갱신은 잠금 없이(GIL) — 드물게 동시 증가 1건이 빠질 수 있는 정도는 허용
+from __future__ import annotations
+import asyncio, bisect, json, os, time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:          # 비 POSIX: 단일 프로세스로 간주
+    fcntl = None
+
+from app.storage import DATA_DIR
+
+ENABLED       = os.getenv("METRICS", "1") == "1"
+SERVER_TIMING = os.getenv("SERVER_TIMING", "1") == "1"
+METRICS_DIR   = Path(os.getenv("METRICS_DIR", str(DATA_DIR / "metrics")))
+FLUSH_SEC     = float(os.getenv("METRICS_FLUSH_SEC", "5"))
+
+# 초 단위 버킷(단계는 수십 µs ~ 수 초, 요청은 ms ~ 수 초)
+STAGE_BUCKETS   = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0)
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CYCLE_BUCKETS   = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def labels(**kw) -> str:
+    # 라벨 문자열(시계열 키 겸 출력 형식)
+    return ",".join(f'{k}="{str(v)}"' for k, v in kw.items())
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self.series: Dict[str, float] = {}
+
+    def inc(self, key: str = "", v: float = 1.0) -> None:
+        s = self.series
+        s[key] = s.get(key, 0.0) + v
+
+    def snapshot(self) -> dict:
+        return {"type": self.kind, "help": self.help, "series": dict(self.series)}
+
+class Gauge(Counter):
+    """merge: 워커 간 합치는 방법("sum" | "max")."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, merge: str = "max"):
+        super().__init__(name, help)
+        self.merge = merge
+
+    def set(self, v: float, key: str = "") -> None:
+        self.series[key] = float(v)
+
+    def snapshot(self) -> dict:
+        return {**super().snapshot(), "merge": self.merge}
+
+class Histogram:
+    """시계열마다 [버킷별 개수(누적 아님, +Inf 포함)..., 합]."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float]):
+        self.name, self.help = name, help
+        self.buckets = tuple(buckets)
+        self.series: Dict[str, List[float]] = {}
+
+    def observe(self, v: float, key: str = "") -> None:
+        row = self.series.get(key)
+        if row is None:
+            row = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        row[bisect.bisect_left(self.buckets, v)] += 1
+        row[-1] += v
+
+    def snapshot(self) -> dict:
+        return {"type": self.kind, "help": self.help, "buckets": list(self.buckets),
+                "series": {k: list(v) for k, v in list(self.series.items())}}
+
+# ---- 등록된 지표 ----
+STAGE     = Histogram("lotto_stage_seconds", "Time spent per hot-path stage", STAGE_BUCKETS)
+REQUEST   = Histogram("lotto_http_request_duration_seconds", "HTTP request latency by route", REQUEST_BUCKETS)
+UPSTREAM  = Counter("lotto_upstream_requests_total", "Upstream HTTP attempts by result (success/failure/timeout)")
+REFRESH   = Histogram("lotto_refresher_cycle_seconds", "Background refresh cycle duration", CYCLE_BUCKETS)
+REFRESH_LAST = Gauge("lotto_refresher_last_cycle_seconds", "Most recent refresh cycle duration (max over workers)")
+WORKERS   = Gauge("lotto_workers", "Live worker processes reporting metrics", merge="sum")
+CACHE_HITS   = Counter("lotto_cache_hits_total", "Cache hits by cache")
+CACHE_MISSES = Counter("lotto_cache_misses_total", "Cache misses by cache")
+_METRICS: List = [STAGE, REQUEST, UPSTREAM, REFRESH, REFRESH_LAST, WORKERS, CACHE_HITS, CACHE_MISSES]
+
+# 캐시 적중: 스크레이프 시점에 캐시 객체의 누적 카운터를 읽음(요청 경로 비용 없음)
+_caches: Dict[str, Callable[[], Dict[str, int]]] = {}
+
+def register_cache(name: str, stats: Callable[[], Dict[str, int]]) -> None:
+    _caches[name] = stats
+
+# ---- 단계 타이머 ----
+_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("lotto_timings", default=None)
+_clock = time.perf_counter
+
+_stage_keys: Dict[str, str] = {}
+
+class stage:
+    """with stage("score"): ...  — 요청 밖(백그라운드)에서는 히스토그램에만 기록."""
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> "stage":
+        self.t0 = _clock()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        dt = _clock() - self.t0
+        if not ENABLED: return
+        name = self.name
+        key = _stage_keys.get(name)
+        if key is None:
+            key = _stage_keys[name] = labels(stage=name)
+        STAGE.observe(dt, key)
+        rec = _timings.get()
+        if rec is not None: rec.append((name, dt))
+
+def refresh_cycle(seconds: float) -> None:
+    REFRESH.observe(seconds)
+    REFRESH_LAST.set(seconds)
+
+def server_timing(rec: Iterable[Tuple[str, float]], total: float) -> str:
+    # 같은 단계가 여러 번이면 합산, 등장 순서 유지
+    acc: Dict[str, float] = {}
+    for name, dt in rec:
+        acc[name] = acc.get(name, 0.0) + dt
+    acc["total"] = total
+    return ", ".join(f"{k};dur={v * 1000.0:.3f}" for k, v in acc.items())
+
+def _route(scope) -> str:
+    route = scope.get("route")
+    if route is not None: return getattr(route, "path", "other")
+    return "static" if scope.get("path", "").startswith("/static") else "unmatched"
+
+class TimingMiddleware:
+    """순수 ASGI: 응답 시작 시 Server-Timing 헤더, 본문 끝에서 요청 지연 관측(SSE는 제외)."""
+
+    def __init__(self, app, profiler=None):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ENABLED:
+            return await self.app(scope, receive, send)
+        rec: List[Tuple[str, float]] = []
+        token = _timings.set(rec)
+        t0 = _clock()
+        prof = self.profiler.begin(scope) if self.profiler else None
+        state = {"status": 500, "stream": False}
+
+        async def _send(msg):
+            if msg["type"] == "http.response.start":
+                state["status"] = msg["status"]
+                headers = msg.setdefault("headers", [])
+                state["stream"] = any(k == b"content-type" and v.startswith(b"text/event-stream") for k, v in headers)
+                if SERVER_TIMING:
+                    msg["headers"] = list(headers) + [(b"server-timing", server_timing(rec, _clock() - t0).encode())]
+            await send(msg)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            dt = _clock() - t0
+            _timings.reset(token)
+            route = _route(scope)
+            if not state["stream"]:
+                REQUEST.observe(dt, labels(route=route, method=scope.get("method", "GET")))
+            if prof is not None:
+                self.profiler.end(prof, route, dt, state["status"])
+
+# ---- 워커 스냅샷/합산 ----
+def snapshot() -> dict:
+    for name, stats in _caches.items():
+        s = stats()
+        CACHE_HITS.series[labels(cache=name)] = float(s.get("hits", 0))
+        CACHE_MISSES.series[labels(cache=name)] = float(s.get("misses", 0))
+    WORKERS.set(1)
+    return {"pid": os.getpid(), "at": time.time(), "metrics": {m.name: m.snapshot() for m in _METRICS}}
+
+def _write(path: Path, data: dict) -> None:
+    tmp = path.with_suffix(f".tmp{os.getpid()}")
+    tmp.write_text(json.dumps(data, separators=(",", ":")))
+    os.replace(tmp, path)
+
+def flush() -> None:
+    METRICS_DIR.mkdir(parents=True, exist_ok=True)
+    _write(METRICS_DIR / f"{os.getpid()}.json", snapshot())
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _merge(into: dict, snap: dict, gauges: bool = True) -> None:
+    for name, m in snap.get("metrics", {}).items():
+        if m["type"] == "gauge" and not gauges: continue
+        dst = into.setdefault(name, {**m, "series": {}})
+        for key, v in m["series"].items():
+            if m["type"] == "histogram":
+                if dst.get("buckets") != m.get("buckets"): continue   # 버킷이 바뀐 옛 파일은 무시
+                old = dst["series"].get(key)
+                dst["series"][key] = [a + b for a, b in zip(old, v)] if old else list(v)
+            elif m["type"] == "gauge" and m.get("merge") == "max":
+                dst["series"][key] = max(dst["series"].get(key, v), v)
+            else:
+                dst["series"][key] = dst["series"].get(key, 0.0) + v
+
+def _fold_dead(paths: List[Path]) -> None:
+    # 죽은 워커 파일을 _dead.json에 누적하고 삭제(잠금으로 워커 간 1번만)
+    dead = METRICS_DIR / "_dead.json"
+    lock = os.open(str(METRICS_DIR / "_dead.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl: fcntl.flock(lock, fcntl.LOCK_EX)
+        acc: dict = {}
+        try: _merge(acc, json.loads(dead.read_text()), gauges=False)
+        except (OSError, ValueError): pass
+        for p in paths:
+            try: _merge(acc, json.loads(p.read_text()), gauges=False)
+            except (OSError, ValueError): continue
+            p.unlink(missing_ok=True)
+        _write(dead, {"pid": 0, "metrics": acc})
+    finally:
+        os.close(lock)
+
+def collect() -> dict:
+    """모든 워커 합산 {이름: 지표}. 자기 워커는 실시간 값, 다른 워커는 마지막 flush 값."""
+    merged: dict = {}
+    me = os.getpid()
+    _merge(merged, snapshot())
+    dead: List[Path] = []
+    if METRICS_DIR.is_dir():
+        for p in METRICS_DIR.glob("*.json"):
+            if p.stem == "_dead":
+                try: _merge(merged, json.loads(p.read_text()), gauges=False)
+                except (OSError, ValueError): pass
+                continue
+            try: pid = int(p.stem)
+            except ValueError: continue
+            if pid == me: continue
+            if not _alive(pid):
+                dead.append(p); continue
+            try: _merge(merged, json.loads(p.read_text()))
+            except (OSError, ValueError): continue
+    if dead:
+        # 이번 응답에도 포함되게 먼저 더한 뒤 접음
+        for p in dead:
+            try: _merge(merged, json.loads(p.read_text()), gauges=False)
+            except (OSError, ValueError): pass
+        try: _fold_dead(dead)
+        except OSError: pass
+    return merged
+
+def _fmt(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+def render(merged: dict) -> str:
+    out: List[str] = []
+    for name, m in merged.items():
+        out.append(f"# HELP {name} {m['help']}")
+        out.append(f"# TYPE {name} {m['type']}")
+        for key, v in sorted(m["series"].items()):
+            if m["type"] != "histogram":
+                out.append(f"{name}{{{key}}} {_fmt(v)}" if key else f"{name} {_fmt(v)}")
+                continue
+            sep = "," if key else ""
+            cum = 0
+            for le, c in zip(list(m["buckets"]) + ["+Inf"], v[:-1]):
+                cum += c
+                out.append(f'{name}_bucket{{{key}{sep}le="{le}"}} {_fmt(cum)}')
+            out.append(f"{name}_sum{{{key}}} {_fmt(v[-1])}" if key else f"{name}_sum {_fmt(v[-1])}")
+            out.append(f"{name}_count{{{key}}} {_fmt(cum)}" if key else f"{name}_count {_fmt(cum)}")
+    # 적중률은 합산된 카운터에서 계산(워커별 비율의 평균이 아님)
+    hits, misses = merged.get(CACHE_HITS.name, {}).get("series", {}), merged.get(CACHE_MISSES.name, {}).get("series", {})
+    if hits:
+        out.append("# HELP lotto_cache_hit_ratio Cache hit ratio across all workers")
+        out.append("# TYPE lotto_cache_hit_ratio gauge")
+        for key in sorted(hits):
+            total = hits[key] + misses.get(key, 0.0)
+            out.append(f"lotto_cache_hit_ratio{{{key}}} {_fmt(hits[key] / total if total else 0.0)}")
+    return "\n".join(out) + "\n"
+
+async def flusher() -> None:
+    while True:
+        await asyncio.sleep(FLUSH_SEC)
+        try: flush()
+        except OSError: pass
+
+def remove() -> None:
+    # 정상 종료: 카운터를 _dead.json에 접어 두고 자기 파일 정리
+    p = METRICS_DIR / f"{os.getpid()}.json"
+    try:
+        flush()
+        _fold_dead([p])
+    except OSError:
+        pass
@@ -0,0 +1,150 @@
+# app/prerender.py — 미리 직렬화·압축한 응답 바이트(정적 자산 + 자주 쓰는 JSON)
+#   Rendered: 원본 바이트 + gzip/brotli 압축본 + 표현별 강한 ETag를 1번만 만들어 둠 → 요청은 dict 조회 + 전송
+#   정적 자산: 내용 해시를 넣은 이름(/assets/app.<해시>.js)으로 1년 immutable 캐시, index.html 안 참조도 바꿔 씀
+#   JSON: (데이터 버전, 키)별로 보관, 데이터 버전이 바뀌면 통째로 비움
+from __future__ import annotations
+import gzip, hashlib, mimetypes, os, re, threading
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Optional
+
+try:
+    import brotli
+except ImportError:          # 선택 의존성: 없으면 gzip만
+    brotli = None
+
+from starlette.responses import Response
+
+from app.cache import etag_matches
+
+MIN_SIZE   = int(os.getenv("PRERENDER_MIN_SIZE", "512"))   # 이보다 작은 본문은 압축본 생략
+GZIP_LEVEL = 9
+BR_QUALITY = 11
+IMMUTABLE  = "public, max-age=31536000, immutable"
+ENCODINGS  = ("br", "gzip")                                 # 서버 선호 순서
+
+def _hash(body: bytes, n: int = 12) -> str:
+    return hashlib.blake2b(body, digest_size=n).hexdigest()
+
+class Rendered:
+    __slots__ = ("body", "media_type", "variants", "etags")
+
+    def __init__(self, body: bytes, media_type: str = "application/json"):
+        self.body, self.media_type = body, media_type
+        self.variants: Dict[str, bytes] = {}
+        if len(body) >= MIN_SIZE:
+            gz = gzip.compress(body, GZIP_LEVEL, mtime=0)
+            if len(gz) < len(body): self.variants["gzip"] = gz
+            if brotli is not None:
+                br = brotli.compress(body, quality=BR_QUALITY)
+                if len(br) < len(body): self.variants["br"] = br
+        h = _hash(body)
+        # 표현(인코딩)마다 다른 강한 ETag
+        self.etags = {None: f'"{h}"', **{enc: f'"{h}-{enc}"' for enc in self.variants}}
+
+    @property
+    def etag(self) -> str:
+        return self.etags[None]
+
+def accepted(header: Optional[str]) -> Dict[str, float]:
+    # Accept-Encoding → {코딩: q}
+    out: Dict[str, float] = {}
+    for part in (header or "").lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if not name: continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try: q = float(params[2:])
+            except ValueError: q = 0.0
+        out[name.strip()] = q
+    return out
+
+def choose(r: Rendered, header: Optional[str]) -> Optional[str]:
+    if not r.variants or not header: return None
+    acc = accepted(header)
+    star = acc.get("*", 0.0)
+    for enc in ENCODINGS:
+        if enc in r.variants and acc.get(enc, star) > 0:
+            return enc
+    return None
+
+def respond(r: Rendered, accept_encoding: Optional[str], if_none_match: Optional[str] = None,
+            cache_control: Optional[str] = None) -> Response:
+    enc = choose(r, accept_encoding)
+    headers = {"ETag": r.etags[enc], "Vary": "Accept-Encoding"}
+    if cache_control: headers["Cache-Control"] = cache_control
+    if etag_matches(if_none_match, r.etags[enc]):
+        return Response(status_code=304, headers=headers)
+    if enc: headers["Content-Encoding"] = enc
+    return Response(content=r.variants[enc] if enc else r.body, media_type=r.media_type, headers=headers)
+
+class HotCache:
+    """(데이터 버전, 키) → Rendered. 다른 버전이 들어오면 이전 항목을 모두 버림."""
+
+    def __init__(self):
+        self.version: Hashable = None
+        self._items: Dict[Hashable, Rendered] = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def get(self, version: Hashable, key: Hashable, build: Callable[[], bytes],
+            media_type: str = "application/json") -> Rendered:
+        if version == self.version:
+            hit = self._items.get(key)
+            if hit is not None: return hit
+        r = Rendered(build(), media_type)
+        with self._lock:
+            if version != self.version:
+                self.version, self._items = version, {}
+            self._items[key] = r
+            self.builds += 1
+        return r
+
+    def stats(self) -> dict:
+        return {"version": self.version, "items": len(self._items), "builds": self.builds,
+                "brotli": brotli is not None}
+
+_REF = re.compile(r'(href|src)="/static/([^"?#]+)(?:\?[^"#]*)?"')
+
+class Assets:
+    """STATIC_DIR 파일 → 해시 이름 Rendered. 시작 시(또는 첫 요청 시) 1번 읽음."""
+
+    def __init__(self, root: Path, prefix: str = "/assets/"):
+        self.root, self.prefix = root, prefix
+        self.files: Dict[str, Rendered] = {}     # 해시 이름 → 바이트
+        self.urls: Dict[str, str] = {}           # 원래 이름 → 해시 URL
+        self._page: Optional[Rendered] = None
+
+    @staticmethod
+    def media_type(name: str) -> str:
+        mt = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        return mt + "; charset=utf-8" if mt.startswith("text/") or mt.endswith("javascript") else mt
+
+    def load(self) -> "Assets":
+        files: Dict[str, Rendered] = {}
+        urls: Dict[str, str] = {}
+        for p in sorted(self.root.iterdir()) if self.root.is_dir() else ():
+            if not p.is_file() or p.name == "index.html": continue
+            data = p.read_bytes()
+            hashed = f"{p.stem}.{_hash(data, 5)}{p.suffix}"
+            files[hashed] = Rendered(data, self.media_type(p.name))
+            urls[p.name] = self.prefix + hashed
+        self.files, self.urls = files, urls
+        html = self.root / "index.html"
+        body = (self.rewrite(html.read_text(encoding="utf-8")) if html.exists()
+                else "<h1>index.html not found</h1>")
+        self._page = Rendered(body.encode("utf-8"), "text/html; charset=utf-8")
+        return self
+
+    def rewrite(self, html: str) -> str:
+        # /static/x.js?v=7 → /assets/x.<해시>.js (모르는 파일은 그대로)
+        return _REF.sub(lambda m: f'{m.group(1)}="{self.urls[m.group(2)]}"' if m.group(2) in self.urls
+                        else m.group(0), html)
+
+    def page(self) -> Rendered:
+        if self._page is None: self.load()
+        return self._page
+
+    def get(self, name: str) -> Optional[Rendered]:
+        if self._page is None: self.load()
+        return self.files.get(name)
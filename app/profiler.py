@@ -0,0 +1,86 @@
+# app/profiler.py — 느린 요청용 표본 추출 프로파일러(선택, PROFILE=1일 때만)
+#   프로파일 대상 요청이 진행 중인 동안만 표본 스레드 1개가 PROFILE_INTERVAL_MS마다 모든 스레드 스택을 읽음
+#   (이벤트 루프 스레드 + run_in_threadpool 작업 포함 — 같은 시각 다른 요청의 스택도 섞일 수 있음)
+#   대상: 요청 헤더 X-Profile: 1, 또는 PROFILE_SAMPLE_RATE 확률로 무작위
+#   보관: 강제 요청이거나 PROFILE_SLOW_MS 이상 걸린 경우만, 최근 PROFILE_KEEP개(접힌 스택 → flamegraph 도구 입력)
+from __future__ import annotations
+import os, random, sys, threading, time
+from collections import Counter, deque
+from typing import Deque, List, Optional, Set
+
+ENABLED  = os.getenv("PROFILE", "0") == "1"
+RATE     = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+SLOW_MS  = float(os.getenv("PROFILE_SLOW_MS", "250"))
+INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000.0
+KEEP     = int(os.getenv("PROFILE_KEEP", "20"))
+MAX_DEPTH = 64
+
+class Session:
+    __slots__ = ("path", "forced", "started", "stacks", "samples")
+
+    def __init__(self, path: str, forced: bool):
+        self.path, self.forced, self.started = path, forced, time.time()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+def _fold(frame) -> str:
+    # 바깥 → 안쪽 순서, "파일:함수;..." (flamegraph.pl / speedscope의 collapsed 형식)
+    parts: List[str] = []
+    while frame is not None and len(parts) < MAX_DEPTH:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+class Profiler:
+    def __init__(self, keep: int = KEEP, interval: float = INTERVAL):
+        self.interval = interval
+        self.profiles: Deque[dict] = deque(maxlen=max(1, keep))
+        self._active: Set[Session] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def begin(self, scope) -> Optional[Session]:
+        if not ENABLED: return None
+        forced = any(k == b"x-profile" and v == b"1" for k, v in scope.get("headers", ()))
+        if not forced and not (RATE > 0 and random.random() < RATE):
+            return None
+        s = Session(scope.get("path", ""), forced)
+        with self._lock:
+            self._active.add(s)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+        return s
+
+    def end(self, s: Session, route: str, seconds: float, status: int) -> None:
+        with self._lock:
+            self._active.discard(s)
+        ms = seconds * 1000.0
+        if s.forced or ms >= SLOW_MS:
+            self.profiles.append({"path": s.path, "route": route, "status": status, "ms": round(ms, 3),
+                                  "at": s.started, "samples": s.samples, "interval_ms": self.interval * 1000.0,
+                                  "stacks": s.stacks.most_common()})
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                sessions = list(self._active)
+                if not sessions:
+                    self._thread = None
+                    return
+            stacks = [_fold(f) for tid, f in sys._current_frames().items() if tid != me]
+            for s in sessions:
+                s.samples += 1
+                s.stacks.update(stacks)
+            time.sleep(self.interval)
+
+    def folded(self) -> str:
+        # 보관된 프로파일 전체를 collapsed 형식 한 덩어리로
+        acc: Counter = Counter()
+        for p in self.profiles:
+            acc.update(dict(p["stacks"]))
+        return "".join(f"{k} {v}\n" for k, v in acc.most_common())
+
+PROFILER = Profiler()
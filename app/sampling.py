@@ -0,0 +1,53 @@
+# app/sampling.py — 전략별 구간(상위/중간/하위) 조합 표본 추출(벡터화, 거절 없음)
+from __future__ import annotations
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# 전략별 (상위20, 중간15, 하위10) 구간에서 뽑을 개수 + 나머지에서 임의 1개 여부
+TIER_PICKS: Dict[str, Tuple[int, int, int, int]] = {
+    "보수형":  (3, 2, 0, 1),
+    "균형형":  (2, 3, 1, 0),
+    "고위험형": (0, 2, 3, 1),
+}
+
+def _pick_distinct(gen: np.random.Generator, rows: int, pool: np.ndarray, k: int) -> np.ndarray:
+    # 행마다 pool에서 서로 다른 k개(균등): 난수 키의 상위 k
+    if k == 0: return np.zeros((rows, 0), dtype=np.int16)
+    keys = gen.random((rows, len(pool)))
+    return pool[np.argpartition(keys, len(pool) - k, axis=1)[:, len(pool) - k:]]
+
+def sample_pool_array(freq: Dict[int, int], strategy: str, seed: int, size: int = 80,
+                      max_passes: int = 8) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    구간별로 서로 겹치지 않게 직접 추출(충돌/거절 없음) → 45비트 마스크로 중복 제거.
+    배치 1회로 대부분 채우고, 중복으로 모자라면 남은 수만큼만 추가 배치. 같은 seed면 같은 결과.
+    """
+    gen = np.random.default_rng(seed)
+    ranked = np.array(sorted(freq, key=lambda n: (-freq[n], n)), dtype=np.int16)
+    tiers = (ranked[:20], ranked[20:35], ranked[35:])
+    need = TIER_PICKS.get(strategy, TIER_PICKS["고위험형"])
+    out: List[np.ndarray] = []
+    seen = np.zeros(0, dtype=np.uint64)
+    drawn = passes = 0
+    while sum(map(len, out)) < size and passes < max_passes:
+        passes += 1
+        rows = max(16, int((size - sum(map(len, out))) * 1.25))
+        parts = [_pick_distinct(gen, rows, t, k) for t, k in zip(tiers, need[:3])]
+        picks = np.concatenate(parts, axis=1)
+        if need[3]:
+            # 이미 뽑은 번호를 제외한 나머지에서 균등 1개
+            keys = gen.random((rows, 46)); keys[:, 0] = -1.0
+            keys[np.arange(rows)[:, None], picks] = -1.0
+            picks = np.concatenate([picks, keys.argmax(axis=1)[:, None].astype(np.int16)], axis=1)
+        picks.sort(axis=1)
+        drawn += rows
+        masks = (np.uint64(1) << (picks.astype(np.uint64) - np.uint64(1))).sum(axis=1, dtype=np.uint64)
+        _, first = np.unique(masks, return_index=True)
+        first.sort()                                  # 배치 내 첫 등장 순서 유지
+        fresh = first[~np.isin(masks[first], seen)]
+        fresh = fresh[:size - sum(map(len, out))]
+        out.append(picks[fresh])
+        seen = np.concatenate([seen, masks[fresh]])
+    arr = np.concatenate(out) if out else np.zeros((0, 6), dtype=np.int16)
+    return arr, {"requested": size, "produced": len(arr), "drawn": drawn, "passes": passes}
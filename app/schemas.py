@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import List
+from typing import List, Literal
 from pydantic import BaseModel, Field
 from typing_extensions import Annotated
 
@@ -11,6 +11,11 @@ class Draw(BaseModel):
     bonus: int = 0
     date: str | None = None
 
+    @classmethod
+    def from_table(cls, table, i: int) -> "Draw":
+        # DrawTable의 i번째 행(응답 경계에서만 변환)
+        return cls(**table.row(i))
+
 class StrategyPick(BaseModel):
     name: str | None = None
     name_ko: str | None = None
@@ -21,8 +26,15 @@ class StrategyPick(BaseModel):
     rationale: str | None = None
 
 class PredictRequest(BaseModel):
-    seed: int | None = None
+    seed: int | None = Field(None, ge=0)
     count: int = 5
+    window: int = Field(60, ge=1, le=5000)
+    strategies: List[str] | None = None          # 보수형/균형형/고위험형(영문 키도 허용), None = 전체
+    weighting: Literal["frequency", "pairs"] = "frequency"   # pairs = 쌍 친화도 가산
+    pair_weight: float = 0.5
+
+class PredictBatchRequest(BaseModel):
+    configs: Annotated[List[PredictRequest], Field(min_length=1, max_length=50)]
 
 class PredictResponse(BaseModel):
     last_draw: Draw
@@ -0,0 +1,78 @@
+# app/scoring.py — (N, 6) 조합 배열을 NumPy로 한 번에 채점
+from __future__ import annotations
+from typing import Dict, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+FreqLike = Union[Mapping[int, int], Sequence[int], np.ndarray]
+
+# 조합 모델별 인접 패널티: (간격1 가중치, 간격2 가중치, 위험 계수)
+MAIN_ADJ  = (1.0, 0.5, 0.3)    # main.score_combo
+LOGIC_ADJ = (1.0, 0.0, 0.8)    # logic._metrics
+
+def freq_lookup(freq: FreqLike) -> np.ndarray:
+    # 번호 → 빈도 조회표(길이 46, 인덱스 0 미사용)
+    lut = np.zeros(46, dtype=np.float64)
+    if isinstance(freq, Mapping):
+        for n, v in freq.items():
+            if 1 <= int(n) <= 45: lut[int(n)] = v
+    else:
+        lut[1:] = np.asarray(freq, dtype=np.float64)[:45]
+    return lut
+
+# 6개 중 쌍 자리(15개)
+_PI = np.array([(i, j) for i in range(6) for j in range(i + 1, 6)], dtype=np.int64)
+
+def pair_affinity(c: np.ndarray, pairs: np.ndarray) -> np.ndarray:
+    # 조합 내 15개 쌍의 평균 동시 출현 수(pairs: cooccur.CoIndex.pair_matrix의 (46,46) 조회표)
+    return pairs[c[:, _PI[:, 0]], c[:, _PI[:, 1]]].mean(axis=1)
+
+def as_combos(combos) -> np.ndarray:
+    arr = np.asarray(combos, dtype=np.int16).reshape(-1, 6)
+    return np.sort(arr, axis=1)
+
+def score_batch(combos, freq: FreqLike, adj: Tuple[float, float, float] = MAIN_ADJ,
+                pairs: Optional[np.ndarray] = None, pair_weight: float = 0.0
+                ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    reward(평균 빈도), risk(분산/100 + 인접 패널티×계수), score = reward/(1+risk) — 모두 길이 N.
+    pairs와 pair_weight>0이 주어지면 reward에 pair_weight×쌍 친화도(평균 쌍 동시 출현 수)를 더함.
+    """
+    c = as_combos(combos)
+    lut = freq if isinstance(freq, np.ndarray) and freq.shape == (46,) else freq_lookup(freq)
+    reward = lut[c].mean(axis=1)
+    if pairs is not None and pair_weight:
+        reward = reward + pair_weight * pair_affinity(c, pairs)
+    x = c.astype(np.float64)
+    variance = x.var(axis=1)
+    gaps = np.diff(c, axis=1)
+    w1, w2, coef = adj
+    penalty = (gaps == 1).sum(axis=1) * w1
+    if w2: penalty = penalty + (gaps == 2).sum(axis=1) * w2
+    risk = variance / 100.0 + penalty * coef
+    score = reward / (1.0 + risk)
+    return reward, risk, score
+
+def top_k(score: np.ndarray, k: int) -> np.ndarray:
+    # 점수 내림차순 상위 k 위치(동점은 입력 순서 유지)
+    n = len(score)
+    if n == 0 or k <= 0: return np.zeros(0, dtype=np.int64)
+    if k < n:
+        idx = np.argpartition(-score, k - 1)[:k]
+        idx.sort()
+    else:
+        idx = np.arange(n)
+    return idx[np.argsort(-score[idx], kind="stable")]
+
+def throughput(n: int = 200_000, repeat: int = 3, seed: int = 0) -> Dict[str, float]:
+    """벤치마크: 초당 채점 조합 수(무작위 n개, 최선 시간 기준)."""
+    import time
+    rng = np.random.default_rng(seed)
+    combos = np.argsort(rng.random((n, 45)), axis=1)[:, :6] + 1
+    freq = rng.integers(0, 30, 45)
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        score_batch(combos, freq)
+        best = min(best, time.perf_counter() - t)
+    return {"combos": n, "seconds": round(best, 4), "combos_per_sec": round(n / best)}
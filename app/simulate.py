@@ -0,0 +1,135 @@
+# app/simulate.py — 몬테카를로 일치 분포: 조합/추첨을 45비트 정수로 두고 popcount로 일치 수 계산
+from __future__ import annotations
+import multiprocessing, os, time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from math import comb
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+BITS    = np.uint64(1) << np.arange(46, dtype=np.uint64) >> np.uint64(1)   # BITS[n] = 1 << (n-1), BITS[0] = 0
+CHUNK   = int(os.getenv("SIM_CHUNK", "1000000"))
+WORKERS = int(os.getenv("SIM_WORKERS", str(os.cpu_count() or 1)))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def to_mask(nums: Sequence[int]) -> int:
+    m = 0
+    for n in nums: m |= 1 << (int(n) - 1)
+    return m
+
+def masks_of(combos: np.ndarray) -> np.ndarray:
+    return np.bitwise_or.reduce(BITS[np.asarray(combos, dtype=np.int64)], axis=1)
+
+if hasattr(np, "bitwise_count"):
+    def popcount(x: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(x)
+else:                                                  # NumPy < 2.0: 바이트 조회표
+    _POP8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+    def popcount(x: np.ndarray) -> np.ndarray:
+        return _POP8[np.ascontiguousarray(x).view(np.uint8).reshape(-1, 8)].sum(axis=1, dtype=np.uint8)
+
+def _bool_masks(b: np.ndarray) -> np.ndarray:
+    # (n,45) bool → uint64 마스크(비트 i = 번호 i+1)
+    out = np.zeros((len(b), 8), dtype=np.uint8)
+    out[:, :6] = np.packbits(b, axis=1, bitorder="little")
+    return out.view("<u8").ravel().astype(np.uint64, copy=False)
+
+def draw_masks(gen: np.random.Generator, n: int, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    n회 추첨 마스크 — 지수 경주(E/w가 작은 6개, Gumbel-top-k와 같은 분포)로 비복원 추첨.
+    weights 없으면 모든 가중치가 같음 → 45개 중 6개 균등(전체 조합표 불필요).
+    """
+    keys = gen.standard_exponential((n, 45), dtype=np.float32)
+    if weights is not None:
+        keys *= (1.0 / np.maximum(np.asarray(weights, dtype=np.float64), 1e-12)).astype(np.float32)
+    thr = np.partition(keys, 5, axis=1)[:, 5:6]
+    masks = _bool_masks(keys <= thr)
+    tie = np.flatnonzero(popcount(masks) != 6)          # float32 동률(드묾)은 정확히 6개로 다시
+    if len(tie):
+        masks[tie] = masks_of(np.argpartition(keys[tie], 5, axis=1)[:, :6] + 1)
+    return masks
+
+def run_chunk(combo_masks: np.ndarray, n: int, seed, weights: Optional[np.ndarray]) -> np.ndarray:
+    """조합별 일치 수(0~6) 히스토그램: (조합 수, 7)."""
+    gen = np.random.default_rng(seed)
+    draws = draw_masks(gen, n, weights)
+    hist = np.zeros((len(combo_masks), 7), dtype=np.int64)
+    for j, m in enumerate(combo_masks):
+        hist[j] = np.bincount(popcount(draws & m), minlength=7)[:7]
+    return hist
+
+def exact_uniform() -> List[float]:
+    # 균등 추첨일 때 일치 수 분포(초기하분포) — 비교 기준
+    total = comb(45, 6)
+    return [comb(6, k) * comb(39, 6 - k) / total for k in range(7)]
+
+def mp_context():
+    # ASGI 워커는 스레드가 도는 중이라 fork가 안전하지 않음(3.12+ 경고) → forkserver, 없으면 spawn
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+def _executor() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=mp_context())
+    return _pool
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def simulate(combos: Sequence[Sequence[int]], samples: int = 1_000_000, weights: Optional[np.ndarray] = None,
+             seed: int = 0, time_limit: float = 10.0, workers: Optional[int] = None) -> Dict[str, object]:
+    """
+    samples회 추첨을 CHUNK 단위로 나눠 프로세스 풀에 분산. time_limit을 넘기면 끝난 청크까지만 집계.
+    """
+    t0 = time.perf_counter()
+    cm = np.array([to_mask(c) for c in combos], dtype=np.uint64)
+    sizes = [min(CHUNK, samples - s) for s in range(0, max(0, samples), CHUNK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    hist = np.zeros((len(cm), 7), dtype=np.int64)
+    done = 0
+    workers = WORKERS if workers is None else workers
+    if workers <= 1 or len(sizes) <= 1:
+        for n, sd in zip(sizes, seeds):
+            if done and time.perf_counter() - t0 > time_limit: break
+            hist += run_chunk(cm, n, sd, weights); done += n
+    else:
+        # 동시에 올리는 청크는 workers개까지 → 시간 제한으로 끝나도 풀에 남는 건 실행 중인 청크 몇 개뿐
+        ex = _executor()
+        jobs = iter(zip(sizes, seeds))
+        futs: Dict = {}
+
+        def refill() -> None:
+            while len(futs) < workers:
+                job = next(jobs, None)
+                if job is None: return
+                futs[ex.submit(run_chunk, cm, job[0], job[1], weights)] = job[0]
+
+        refill()
+        while futs:
+            left = time_limit - (time.perf_counter() - t0)
+            if left <= 0 and done: break
+            # 시간이 지났는데 끝난 청크가 없으면 첫 청크까지는 블록 대기(busy-wait 없음)
+            finished, _ = wait(futs, timeout=left if left > 0 else None, return_when=FIRST_COMPLETED)
+            for f in finished:
+                hist += f.result(); done += futs.pop(f)
+            if time.perf_counter() - t0 < time_limit: refill()
+        for f in futs: f.cancel()
+    secs = time.perf_counter() - t0
+    ref = exact_uniform()
+    rows = []
+    for j, c in enumerate(combos):
+        tot = int(hist[j].sum()) or 1
+        dist = hist[j] / tot
+        rows.append({"numbers": sorted(int(x) for x in c),
+                     "dist": {str(k): round(float(dist[k]), 7) for k in range(7)},
+                     "p3plus": round(float(dist[3:].sum()), 7),
+                     "uniform_p3plus": round(sum(ref[3:]), 7)})
+    return {"samples": done, "requested": samples, "model": "uniform" if weights is None else "frequency",
+            "seconds": round(secs, 3),
+            "comparisons_per_sec": round(done * len(cm) / secs) if secs > 0 else 0,
+            "truncated": done < samples, "results": rows}
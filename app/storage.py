@@ -1,12 +1,16 @@
 from __future__ import annotations
 from pathlib import Path
-import json
-from typing import List, Dict, Any
+import json, os, sqlite3, threading
+from typing import List, Dict, Any, Iterable, Optional
 
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
+DB_PATH = Path(os.getenv("DRAWS_DB", str(DATA_DIR / "draws.sqlite3")))
+# 이전 JSON 파일들: 최초 1회 DB로 이관
 RECENT_PATH = DATA_DIR / "recent.json"
-LAST_PATH = DATA_DIR / "last.json"
+SEED_PATH = DATA_DIR / "seed.json"
+LAST_PATH = DATA_DIR / "last_draw.json"
+LEGACY_PATHS = [RECENT_PATH, SEED_PATH, LAST_PATH, DATA_DIR / "recent10.json", DATA_DIR / "last.json"]
 
 # 즉시 응답용 스냅샷(없어도 화면이 비지 않도록 최소 데이터 제공)
 DEFAULT_RECENT: List[Dict[str, Any]] = [
@@ -22,6 +26,135 @@ DEFAULT_RECENT: List[Dict[str, Any]] = [
     {"draw_no": 1193, "numbers":[1,2,5,9,15,34],    "bonus":23, "date":"2024-10-12"},
 ]
 
+# ---- SQLite(WAL) 백엔드: 회차 1건 = 행 1개, 추가 비용 O(1), 프로세스 간 원자적 ----
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS draws (
+    draw_no INTEGER PRIMARY KEY,
+    n1 INTEGER NOT NULL, n2 INTEGER NOT NULL, n3 INTEGER NOT NULL,
+    n4 INTEGER NOT NULL, n5 INTEGER NOT NULL, n6 INTEGER NOT NULL,
+    bonus INTEGER NOT NULL DEFAULT 0,
+    date TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+_COLS = "draw_no, n1, n2, n3, n4, n5, n6, bonus, date"
+_UPSERT = f"INSERT OR REPLACE INTO draws ({_COLS}) VALUES (?,?,?,?,?,?,?,?,?)"
+_SET_META = "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)"
+
+_lock = threading.RLock()
+_conn: Optional[sqlite3.Connection] = None
+
+def connect(path: Path = DB_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), timeout=10.0, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=10000")
+    conn.executescript(_SCHEMA)
+    return conn
+
+def db() -> sqlite3.Connection:
+    # 프로세스 공용 연결(첫 사용 시 생성 + 이관)
+    global _conn
+    with _lock:
+        if _conn is None:
+            _conn = connect()
+            migrate_legacy(_conn)
+        return _conn
+
+def _row(d: Dict[str, Any]) -> Optional[tuple]:
+    try:
+        no = int(d.get("draw_no", 0))
+        nums = sorted(int(n) for n in d.get("numbers", []))
+    except Exception:
+        return None
+    if no <= 0 or len(nums) != 6:
+        return None  # 자리표시자(draw_no=0) 등은 저장하지 않음
+    return (no, *nums, int(d.get("bonus", 0) or 0), d.get("date"))
+
+def _draw(r: tuple) -> Dict[str, Any]:
+    return {"draw_no": r[0], "numbers": list(r[1:7]), "bonus": r[7], "date": r[8]}
+
+def upsert_many(items: Iterable[Dict[str, Any]], conn: Optional[sqlite3.Connection] = None,
+                meta: Optional[Dict[str, Any]] = None) -> int:
+    # meta: 같은 트랜잭션에서 함께 쓸 meta 키/값(예: 백필 체크포인트)
+    rows = [r for r in map(_row, items) if r]
+    if not rows and not meta: return 0
+    conn = conn or db()
+    with _lock:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if rows: conn.executemany(_UPSERT, rows)
+            if meta: conn.executemany(_SET_META, [(k, json.dumps(v)) for k, v in meta.items()])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    return len(rows)
+
+def upsert_draw(item: Dict[str, Any]) -> bool:
+    try: return upsert_many([item]) == 1
+    except Exception: return False
+
+def range_draws(start: int, end: int) -> List[Dict[str, Any]]:
+    # PRIMARY KEY 범위 조회(인덱스 사용)
+    with _lock:
+        rows = db().execute(f"SELECT {_COLS} FROM draws WHERE draw_no BETWEEN ? AND ? ORDER BY draw_no",
+                            (start, end)).fetchall()
+    return [_draw(r) for r in rows]
+
+def all_draws(conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, Any]]:
+    conn = conn or db()
+    with _lock:
+        rows = conn.execute(f"SELECT {_COLS} FROM draws ORDER BY draw_no").fetchall()
+    return [_draw(r) for r in rows]
+
+def max_draw_no() -> int:
+    with _lock:
+        r = db().execute("SELECT MAX(draw_no) FROM draws").fetchone()
+    return int(r[0] or 0)
+
+def data_version(conn: sqlite3.Connection) -> int:
+    # 다른 연결(다른 워커)이 커밋하면 값이 바뀜
+    with _lock:
+        return int(conn.execute("PRAGMA data_version").fetchone()[0])
+
+def get_meta(key: str, default: Any = None, conn: Optional[sqlite3.Connection] = None) -> Any:
+    conn = conn or db()
+    with _lock:
+        r = conn.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+    try: return json.loads(r[0]) if r else default
+    except Exception: return default
+
+def set_meta(key: str, value: Any, conn: Optional[sqlite3.Connection] = None) -> None:
+    conn = conn or db()
+    with _lock:
+        conn.execute(_SET_META, (key, json.dumps(value)))
+
+def _legacy_items(raw: Any) -> List[Dict[str, Any]]:
+    if isinstance(raw, dict):
+        return [raw] if "draw_no" in raw else [v for v in raw.values() if isinstance(v, dict)]
+    return [v for v in raw if isinstance(v, dict)] if isinstance(raw, list) else []
+
+def migrate_legacy(conn: sqlite3.Connection, paths: Iterable[Path] = LEGACY_PATHS) -> int:
+    """recent.json / seed.json / last_draw.json 등을 1회 이관. 워커 간에는 쓰기 잠금으로 직렬화."""
+    with _lock:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM meta WHERE key='migrated'").fetchone():
+                conn.execute("COMMIT")
+                return 0
+            rows = []
+            for p in paths:
+                rows += [r for r in map(_row, _legacy_items(_safe_read(p, []))) if r]
+            # 기존 행은 덮어쓰지 않음(INSERT OR IGNORE)
+            conn.executemany(f"INSERT OR IGNORE INTO draws ({_COLS}) VALUES (?,?,?,?,?,?,?,?,?)", rows)
+            conn.execute("INSERT INTO meta (key, value) VALUES ('migrated', ?)", (str(len(rows)),))
+            conn.execute("COMMIT")
+            return len(rows)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
 def _safe_read(path: Path, default):
     try:
         if path.exists():
@@ -30,18 +163,15 @@ def _safe_read(path: Path, default):
         pass
     return default
 
+# ---- 기존 호출부 호환 ----
 def read_recent() -> List[Dict[str, Any]]:
-    data = _safe_read(RECENT_PATH, DEFAULT_RECENT)
-    data = sorted(data, key=lambda x: int(x.get("draw_no", 0)))
-    for it in data:
-        it["numbers"] = sorted([int(n) for n in it.get("numbers", [])])
-        it["bonus"] = int(it.get("bonus", 0))
-        it["draw_no"] = int(it.get("draw_no", 0))
-    return data
+    # 정렬/정규화는 저장소 로드 시 1회만 수행됨
+    from app.store import STORE
+    return STORE.all() or DEFAULT_RECENT
 
 def write_recent(items: List[Dict[str, Any]]):
     try:
-        RECENT_PATH.write_text(json.dumps(items, ensure_ascii=False), encoding="utf-8")
+        upsert_many(items)
     except Exception:
         pass
 
@@ -50,7 +180,4 @@ def read_last_draw() -> Dict[str, Any]:
     return items[-1] if items else DEFAULT_RECENT[-1]
 
 def write_last_draw(item: Dict[str, Any]):
-    try:
-        LAST_PATH.write_text(json.dumps(item, ensure_ascii=False), encoding="utf-8")
-    except Exception:
-        pass
+    upsert_draw(item)
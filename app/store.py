@@ -0,0 +1,176 @@
+# app/store.py — 프로세스 내 회차 저장소(시작 시 1회 로드, DB 변경/명시적 쓰기로 무효화)
+from __future__ import annotations
+import os, time, threading, sqlite3
+from typing import Any, Dict, List, Optional
+
+from app import storage
+from app.freqindex import FreqIndex
+from app.cooccur import CoIndex
+from app.drawtable import DrawTable
+
+# 변경 확인 주기(초): 요청마다 DB를 조회하지 않도록 제한
+CHECK_INTERVAL = float(os.getenv("STORE_CHECK_SEC", "1.0"))
+
+def normalize_draw(it: Any) -> Optional[dict]:
+    try:
+        no = int(it.get("draw_no", 0))
+        nums = sorted(int(n) for n in it.get("numbers", []))
+    except Exception:
+        return None
+    if no <= 0 or len(nums) != 6:
+        return None  # 자리표시자(draw_no=0) 등은 제외
+    return {"draw_no": no, "numbers": nums,
+            "bonus": int(it.get("bonus", 0) or 0), "date": it.get("date")}
+
+class DrawStore:
+    """회차 열 배열(DrawTable). 조회/구간 슬라이스 O(log n), dict 변환은 응답 경계에서만."""
+
+    def __init__(self, db_path=None):
+        self._db_path = db_path or storage.DB_PATH
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._table = DrawTable()
+        self._index = FreqIndex()
+        self._cooc  = CoIndex()
+        self._sig: Optional[int] = None
+        self._checked = 0.0
+        self.version = 0               # 내용이 바뀔 때마다 증가
+
+    # ---- 로드/무효화 ----
+    def _db(self) -> sqlite3.Connection:
+        # 저장소 전용 연결: 다른 연결(다른 워커/storage 모듈)의 커밋만 data_version을 바꿈
+        if self._conn is None:
+            self._conn = storage.connect(self._db_path)
+            storage.migrate_legacy(self._conn)
+        return self._conn
+
+    def _load(self) -> None:
+        by_no: Dict[int, dict] = {}
+        try:
+            for d in storage.all_draws(self._db()):
+                by_no[d["draw_no"]] = d
+        except Exception:
+            if len(self._table): return  # 일시 오류: 기존 스냅샷 유지
+        self._rebuild(by_no[n] for n in sorted(by_no))
+        self.version += 1
+
+    def _rebuild(self, draws) -> None:
+        self._table = DrawTable(draws)
+        self._index = FreqIndex(self._table)
+        self._cooc  = CoIndex(self._table)
+
+    def refresh(self, force: bool = False) -> bool:
+        # force: 확인 주기(CHECK_INTERVAL)만 건너뜀 — data_version이 그대로면 재로드하지 않음
+        now = time.monotonic()
+        if not force and self._sig is not None and now - self._checked < CHECK_INTERVAL:
+            return False
+        with self._lock:
+            self._checked = now
+            try: sig = storage.data_version(self._db())
+            except Exception: sig = -1
+            if self._sig is not None and sig == self._sig:
+                return False
+            self._load()
+            self._sig = sig
+            return True
+
+    # ---- 조회 ----
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._table)
+
+    def get(self, no: int) -> Optional[dict]:
+        self.refresh()
+        return self._table.get(no)
+
+    def latest_no(self) -> int:
+        self.refresh()
+        return int(self._table.no[-1]) if len(self._table) else 0
+
+    def first_no(self) -> int:
+        self.refresh()
+        return int(self._table.no[0]) if len(self._table) else 0
+
+    def latest(self) -> Optional[dict]:
+        self.refresh()
+        return self._table.row(len(self._table) - 1) if len(self._table) else None
+
+    @property
+    def table(self) -> DrawTable:
+        self.refresh()
+        return self._table
+
+    @property
+    def index(self) -> FreqIndex:
+        self.refresh()
+        return self._index
+
+    @property
+    def cooc(self) -> CoIndex:
+        self.refresh()
+        return self._cooc
+
+    def resolve_end(self, end_no: int) -> int:
+        # 저장되지 않은 회차를 요청하면 최신 회차 기준으로
+        self.refresh()
+        t = self._table
+        return end_no if t.find(end_no) >= 0 else (int(t.no[-1]) if len(t) else 0)
+
+    def slice(self, start: int, end: int) -> DrawTable:
+        # 구간 뷰(복사 없음)
+        self.refresh()
+        return self._table.slice(start, end)
+
+    def range(self, start: int, end: int) -> List[dict]:
+        return self.slice(start, end).to_dicts()
+
+    def window(self, end_no: int, n: int) -> List[dict]:
+        return self.range(end_no - n + 1, end_no)
+
+    def all(self) -> List[dict]:
+        self.refresh()
+        return self._table.to_dicts()
+
+    # ---- 쓰기 ----
+    def put(self, draw: dict) -> bool:
+        """새 회차 1건을 DB에 추가(O(1))하고 메모리 배열/인덱스를 갱신."""
+        return self.put_many([draw]) == 1
+
+    def put_many(self, draws: List[dict], meta: Optional[Dict[str, Any]] = None) -> int:
+        """여러 회차(+ meta 키/값)를 한 트랜잭션으로 저장. 반환: 새로 추가/변경된 건수."""
+        with self._lock:
+            self.refresh()
+            t = self._table
+            items = {}
+            for it in draws:
+                d = normalize_draw(it)
+                if d and t.get(d["draw_no"]) != d:
+                    items[d["draw_no"]] = d
+            try: storage.upsert_many(items.values(), conn=self._db(), meta=meta)
+            except Exception: return 0
+            if not items: return 0
+            new = [items[n] for n in sorted(items)]
+            # 최신 회차 추가는 배열/인덱스에 덧붙이고, 중간 삽입/수정이면 재구성
+            tail = (len(t) == 0 or new[0]["draw_no"] > int(t.no[-1])) and t.extend(new)
+            if tail:
+                if not self._index.extend(new): self._index = FreqIndex(t)
+                if not self._cooc.extend(new): self._cooc = CoIndex(t)
+            else:
+                merged = {d["draw_no"]: d for d in t}
+                merged.update(items)
+                self._rebuild(merged[n] for n in sorted(merged))
+            self.version += 1
+            return len(items)
+
+    # meta도 저장소 전용 연결로 읽고 씀(storage.db()로 쓰면 data_version이 바뀌어 전체 재로드)
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        return storage.get_meta(key, default, conn=self._db())
+
+    def set_meta(self, key: str, value: Any) -> None:
+        storage.set_meta(key, value, conn=self._db())
+
+    def nos(self) -> List[int]:
+        self.refresh()
+        return self._table.no.tolist()
+
+STORE = DrawStore()
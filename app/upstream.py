@@ -0,0 +1,107 @@
+# app/upstream.py — 동행복권 호출 공용 클라이언트(앱 수명 동안 1개, 연결 재사용)
+from __future__ import annotations
+import asyncio, os
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app import metrics
+
+DH_BASE   = os.getenv("DH_BASE", "https://www.dhlottery.co.kr/common.do")   # 로컬 모의 서버 지정 가능
+HEADERS   = {"User-Agent": "lotto-predictor/safe"}
+TIMEOUT   = httpx.Timeout(3.0, connect=2.0, read=2.0)
+
+# 풀/동시성/재시도 정책(환경변수로 조정)
+MAX_CONN     = int(os.getenv("UPSTREAM_MAX_CONN", "10"))
+KEEPALIVE    = int(os.getenv("UPSTREAM_KEEPALIVE", "10"))
+KEEPALIVE_S  = float(os.getenv("UPSTREAM_KEEPALIVE_SEC", "30"))
+CONCURRENCY  = int(os.getenv("UPSTREAM_CONCURRENCY", "8"))
+RETRIES      = int(os.getenv("UPSTREAM_RETRIES", "1"))
+BACKOFF      = float(os.getenv("UPSTREAM_BACKOFF", "0.15"))   # 지수 백오프 기본 간격(초)
+HTTP2        = os.getenv("UPSTREAM_HTTP2", "0") == "1"
+
+_client: Optional[httpx.AsyncClient] = None
+_sem: Optional[asyncio.Semaphore] = None
+_transport: Optional[httpx.AsyncBaseTransport] = None
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def configure(transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+    """테스트/로컬 모의 서버용 전송 계층 지정(httpx.MockTransport 등). 다음 생성부터 적용."""
+    global _transport
+    _transport = transport
+
+def _build() -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=MAX_CONN, max_keepalive_connections=KEEPALIVE,
+                          keepalive_expiry=KEEPALIVE_S)
+    return httpx.AsyncClient(timeout=TIMEOUT, headers=HEADERS, limits=limits,
+                             http2=HTTP2 and _http2_available(), transport=_transport)
+
+def client() -> httpx.AsyncClient:
+    # lifespan 밖(CLI 등)에서 호출되면 지연 생성
+    global _client, _sem
+    if _client is None or _client.is_closed:
+        _client = _build()
+    if _sem is None:
+        _sem = asyncio.Semaphore(CONCURRENCY)
+    return _client
+
+async def startup() -> None:
+    client()
+
+async def shutdown() -> None:
+    global _client, _sem
+    if _client is not None:
+        await _client.aclose()
+    _client, _sem = None, None
+
+_SUCCESS, _FAILURE, _TIMEOUT = (metrics.labels(result=r) for r in ("success", "failure", "timeout"))
+
+async def get_json(url: str, params: Optional[Dict[str, Any]] = None,
+                   retries: Optional[int] = None, timeout: Optional[float] = None) -> Any:
+    """전역 세마포어 + 재시도/지수 백오프. 최종 실패 시 마지막 예외를 던짐."""
+    c = client()
+    retries = RETRIES if retries is None else retries
+    last_err: Exception = RuntimeError("upstream: no attempt")
+    for attempt in range(retries + 1):
+        try:
+            async with _sem:
+                with metrics.stage("upstream"):
+                    r = await c.get(url, params=params, timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT)
+            r.raise_for_status()
+            data = r.json()
+            metrics.UPSTREAM.inc(_SUCCESS)
+            return data
+        except Exception as e:
+            metrics.UPSTREAM.inc(_TIMEOUT if isinstance(e, httpx.TimeoutException) else _FAILURE)
+            last_err = e
+            if attempt < retries:
+                await asyncio.sleep(BACKOFF * (2 ** attempt))
+    raise last_err
+
+def parse_draw(data: Any) -> Optional[dict]:
+    if not isinstance(data, dict) or str(data.get("returnValue", "")).lower() != "success":
+        return None
+    nums = [data.get(f"drwtNo{i}") for i in range(1, 7)]
+    if None in nums: return None
+    return {
+        "draw_no": int(data["drwNo"]),
+        "numbers": sorted(int(n) for n in nums),
+        "bonus": int(data.get("bnusNo", 0) or 0),
+        "date": data.get("drwNoDate"),
+    }
+
+async def get_draw_json(drw_no: int, **kw) -> Any:
+    return await get_json(DH_BASE, params={"method": "getLottoNumber", "drwNo": str(drw_no)}, **kw)
+
+async def fetch_draw(drw_no: int, **kw) -> Optional[dict]:
+    # 미발표 회차/오류는 None
+    try:
+        return parse_draw(await get_draw_json(drw_no, **kw))
+    except Exception:
+        return None
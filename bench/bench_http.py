@@ -0,0 +1,83 @@
+# bench/bench_http.py — 엔드포인트 부하 측정(프로세스 내 ASGI, 상류는 합성 이력을 돌려주는 가짜)
+#   python -m bench.bench_http [크기] [--requests 200] [--concurrency 16] [--rounds 3]
+#   DRAWS_DB는 app 모듈 import 시점에 읽히므로 크기마다 새 프로세스에서 실행(bench.run이 처리)
+from __future__ import annotations
+import argparse, asyncio, json, os, shutil, tempfile, time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import httpx
+
+from bench.synthetic import make_history, write_db
+from bench.timing import percentile
+
+def fake_upstream(draws: List[dict]) -> httpx.MockTransport:
+    by_no = {d["draw_no"]: d for d in draws}
+    def handler(req: httpx.Request) -> httpx.Response:
+        d = by_no.get(int(req.url.params.get("drwNo") or 0))
+        if not d:
+            return httpx.Response(200, json={"returnValue": "fail"})
+        body = {"returnValue": "success", "drwNo": d["draw_no"], "drwNoDate": d["date"], "bnusNo": d["bonus"],
+                **{f"drwtNo{i + 1}": v for i, v in enumerate(d["numbers"])}}
+        return httpx.Response(200, json=body)
+    return httpx.MockTransport(handler)
+
+def endpoints(last: int) -> Dict[str, Callable[[int], str]]:
+    return {
+        "latest":       lambda i: "/api/latest",
+        "predict":      lambda i: "/api/predict",
+        "predict_miss": lambda i: f"/api/predict?window={10 + i}",          # 매번 다른 창 → 캐시 미스
+        "recent_100":   lambda i: f"/api/dhlottery/recent?end_no={last}&n=100",
+        "range_freq":   lambda i: f"/api/range_freq_by_end?end_no={last}&n={10 + i % 100}",
+        "cooccurrence": lambda i: f"/api/cooccurrence?n={10 + i % 100}&heatmap=0",
+        "export_1k":    lambda i: "/api/export/draws?limit=1000",
+    }
+
+async def load(client: httpx.AsyncClient, url: Callable[[int], str], total: int, concurrency: int) -> dict:
+    lat: List[float] = []
+    it = iter(range(total))
+    async def worker():
+        for i in it:
+            t = time.perf_counter()
+            r = await client.get(url(i))
+            lat.append((time.perf_counter() - t) * 1000.0)
+            if r.status_code != 200: raise RuntimeError(f"{url(i)} -> {r.status_code}")
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    secs = time.perf_counter() - t0
+    return {"p50_ms": round(percentile(lat, 50), 3), "p99_ms": round(percentile(lat, 99), 3),
+            "rps": round(total / secs, 1)}
+
+async def run(n: int, total: int = 200, concurrency: int = 16, rounds: int = 3) -> Dict[str, dict]:
+    draws = make_history(n)
+    path = Path(tempfile.mkdtemp(prefix="lotto-bench-")) / "draws.sqlite3"
+    # app.storage가 import되기 전에 DB 경로/설정을 정함
+    os.environ.update(DRAWS_DB=str(path), LIVE_FETCH="1", EXACT_WARM="0", BACKFILL="0",
+                      REFRESH_SEC="3600", PROBE_MIN_SEC="3600")
+    write_db(draws, path)
+    from app import upstream
+    from app.main import app
+    upstream.configure(fake_upstream(draws))
+    t = time.perf_counter()
+    out: Dict[str, dict] = {}
+    try:
+        async with app.router.lifespan_context(app):
+            out["startup"] = {"ms": round((time.perf_counter() - t) * 1000.0, 3)}
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as c:
+                for name, url in endpoints(n).items():
+                    await c.get(url(0))                              # 준비 요청 1회
+                    # 여러 회 중 p50이 가장 낮은 회(스케줄러 잡음 제거)
+                    out[name] = min([await load(c, url, total, concurrency) for _ in range(rounds)],
+                                    key=lambda r: r["p50_ms"])
+    finally:
+        shutil.rmtree(path.parent, ignore_errors=True)
+    return out
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="엔드포인트 부하 측정")
+    ap.add_argument("size", type=int, nargs="?", default=1000)
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--rounds", type=int, default=3)
+    args = ap.parse_args()
+    print(json.dumps({"size": args.size, **asyncio.run(run(args.size, args.requests, args.concurrency, args.rounds))}))
@@ -0,0 +1,44 @@
+# bench/bench_logic.py — 이력 크기별 로직 함수 마이크로벤치(ms)
+#   python -m bench.bench_logic [크기 ...]
+from __future__ import annotations
+import json, random, sys
+from typing import Dict
+
+from app.cooccur import CoIndex
+from app.drawtable import DrawTable
+from app.freqindex import FreqIndex
+from app.logic import compute_all, _gen_candidates_array
+from app.main import build_freq, compute_range_freq, make_strategy_result, sample_pool_by_strategy
+from bench.synthetic import SIZES, make_history
+from bench.timing import measure
+
+WINDOW = 60
+
+def run(n: int) -> Dict[str, dict]:
+    draws = make_history(n)
+    last = draws[-1]["draw_no"]
+    table = DrawTable(draws)
+    index = FreqIndex(table)
+    freq_w = index.freq(last, WINDOW)
+    freq_all = build_freq(draws)
+    weights = {k: v + 1 for k, v in freq_w.items()}
+    return {
+        # 인덱스 구축(시작 시 1회)
+        "drawtable_build":  measure(lambda: DrawTable(draws), repeat=3),
+        "freqindex_build":  measure(lambda: FreqIndex(table), repeat=3),
+        "coindex_build":    measure(lambda: CoIndex(table), repeat=3),
+        # 요청 경로
+        "freqindex_window": measure(lambda: index.freq(last, WINDOW), repeat=50),
+        "build_freq_all":   measure(lambda: build_freq(draws), repeat=5),
+        "compute_range_freq_all": measure(lambda: compute_range_freq(draws), repeat=5),
+        "make_strategy_result_window": measure(lambda: make_strategy_result(None, last, freq=freq_w), repeat=20),
+        "make_strategy_result_all":    measure(lambda: make_strategy_result(draws, last), repeat=5),
+        "compute_all": measure(lambda: compute_all(0, draws, count=5, window=WINDOW), repeat=5),
+        "sample_pool_by_strategy": measure(lambda: sample_pool_by_strategy(freq_all, "균형형", seed=1), repeat=50),
+        "gen_candidates_1k": measure(lambda: _gen_candidates_array("Balanced", 1000, random.Random(1), weights),
+                                     repeat=20),
+    }
+
+if __name__ == "__main__":
+    for n in (map(int, sys.argv[1:]) if len(sys.argv) > 1 else SIZES):
+        print(json.dumps({"size": n, **run(n)}, ensure_ascii=False))
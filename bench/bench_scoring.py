@@ -0,0 +1,30 @@
+# bench/bench_scoring.py — 조합 채점 처리량(조합/초): 1개씩(score_combo) vs 배치(score_batch)
+#   python -m bench.bench_scoring [N ...]
+from __future__ import annotations
+import sys, time
+
+import numpy as np
+
+from app.main import score_combo
+from app.scoring import score_batch, freq_lookup
+
+def run(n: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    combos = np.argsort(rng.random((n, 45)), axis=1)[:, :6] + 1
+    freq = {i + 1: int(v) for i, v in enumerate(rng.integers(0, 30, 45))}
+    lut = freq_lookup(freq)
+
+    sample = combos[:min(n, 20_000)].tolist()
+    t = time.perf_counter()
+    for c in sample: score_combo(c, freq)
+    py = len(sample) / (time.perf_counter() - t)
+
+    t = time.perf_counter()
+    score_batch(combos, lut)
+    vec = n / (time.perf_counter() - t)
+    return {"n": n, "python_combos_per_sec": round(py), "batch_combos_per_sec": round(vec),
+            "speedup": round(vec / py, 1)}
+
+if __name__ == "__main__":
+    for n in (map(int, sys.argv[1:]) if len(sys.argv) > 1 else (80, 10_000, 300_000)):
+        print(run(n))
@@ -0,0 +1,99 @@
+# bench/run.py — 벤치 묶음 실행 + JSON 기준선 저장/비교(회귀 게이트)
+#   python -m bench.run                          # 측정만(1k/10k/100k)
+#   python -m bench.run --save                   # bench/baseline.json 갱신
+#   python -m bench.run --check --threshold 0.3  # 기준선 대비 30% 넘게 느려진 항목이 있으면 종료 코드 1
+#                                                #   (회귀로 보이면 해당 크기만 --confirm회 재측정해 좋은 값으로 판정)
+from __future__ import annotations
+import argparse, json, os, platform, subprocess, sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from bench import bench_logic
+from bench.synthetic import SIZES
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+MIN_DELTA_MS = 0.5      # 이보다 작은 차이는 잡음으로 봄
+GATED = ("ms_min", "p50_ms")   # 게이트 대상 — 로직은 최솟값, HTTP는 중앙값(시작 시간·p99·rps는 보고만)
+
+def run_http(n: int, requests: int, concurrency: int) -> dict:
+    # DRAWS_DB가 import 시점에 고정되므로 크기마다 새 프로세스
+    out = subprocess.run([sys.executable, "-m", "bench.bench_http", str(n), "--requests", str(requests),
+                          "--concurrency", str(concurrency)], capture_output=True, text=True, check=True,
+                         env={**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.getenv("PYTHONPATH")]))})
+    res = json.loads(out.stdout.strip().splitlines()[-1])
+    res.pop("size", None)
+    return res
+
+def collect(sizes: List[int], http: bool, requests: int, concurrency: int) -> dict:
+    results: Dict[str, dict] = {}
+    for n in sizes:
+        results[str(n)] = {"logic": bench_logic.run(n)}
+        if http: results[str(n)]["http"] = run_http(n, requests, concurrency)
+        print(json.dumps({"size": n, **results[str(n)]}, ensure_ascii=False), file=sys.stderr)
+    return {"meta": {"python": platform.python_version(), "numpy": np.__version__,
+                     "machine": platform.machine(), "cpus": os.cpu_count()},
+            "results": results}
+
+def compare(base: dict, cur: dict, threshold: float) -> List[Tuple[str, float, float]]:
+    """(항목, 기준, 현재) 중 회귀만. GATED 지표가 threshold 넘게 커지면 회귀."""
+    bad = []
+    for size, groups in cur["results"].items():
+        for group, items in groups.items():
+            for name, m in items.items():
+                b = base.get("results", {}).get(size, {}).get(group, {}).get(name)
+                if not b: continue
+                for key in GATED:
+                    if key in m and key in b and m[key] > b[key] * (1 + threshold) and m[key] - b[key] > MIN_DELTA_MS:
+                        bad.append((f"{size}/{group}/{name}.{key}", b[key], m[key]))
+    return bad
+
+def best_of(a: dict, b: dict) -> dict:
+    # 같은 모양의 두 결과에서 항목별로 더 좋은 쪽(GATED 기준)
+    out = {"meta": a["meta"], "results": {}}
+    for size, groups in a["results"].items():
+        out["results"][size] = {}
+        for group, items in groups.items():
+            merged = {}
+            for name, m in items.items():
+                o = b["results"].get(size, {}).get(group, {}).get(name)
+                key = next((k for k in GATED if k in m), None)
+                merged[name] = o if o and key and o.get(key, m[key]) < m[key] else m
+            out["results"][size][group] = merged
+    return out
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="성능 벤치 + 회귀 게이트")
+    ap.add_argument("--sizes", default=",".join(map(str, SIZES)))
+    ap.add_argument("--no-http", action="store_true")
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--save", action="store_true", help="결과를 기준선으로 저장")
+    ap.add_argument("--check", action="store_true", help="기준선과 비교해 회귀 시 종료 코드 1")
+    ap.add_argument("--threshold", type=float, default=0.3)
+    ap.add_argument("--confirm", type=int, default=2, help="회귀로 보이는 크기만 다시 측정할 횟수(공유 CPU 잡음 대비)")
+    ap.add_argument("--out", type=Path, default=None, help="이번 결과 JSON 저장 경로")
+    args = ap.parse_args()
+
+    cur = collect([int(x) for x in args.sizes.split(",") if x.strip()], not args.no_http,
+                  args.requests, args.concurrency)
+    if args.out: args.out.write_text(json.dumps(cur, ensure_ascii=False, indent=1))
+    if args.save:
+        args.baseline.write_text(json.dumps(cur, ensure_ascii=False, indent=1) + "\n")
+        print(f"saved {args.baseline}")
+    if args.check:
+        if not args.baseline.exists():
+            sys.exit(f"baseline not found: {args.baseline}")
+        base = json.loads(args.baseline.read_text())
+        bad = compare(base, cur, args.threshold)
+        for _ in range(args.confirm):
+            if not bad: break
+            again = sorted({int(name.split("/")[0]) for name, _, _ in bad})
+            cur = best_of(cur, collect(again, not args.no_http, args.requests, args.concurrency))
+            bad = compare(base, cur, args.threshold)
+        for name, b, c in bad:
+            print(f"REGRESSION {name}: {b} -> {c} ({(c / b - 1) * 100 if b else 0:+.0f}%)")
+        if bad: sys.exit(1)
+        print(f"ok: no regressions beyond {args.threshold:.0%}")
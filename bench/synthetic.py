@@ -0,0 +1,32 @@
+# bench/synthetic.py — 결정적 합성 이력(1회부터 n회까지, 매주 토요일) + 벤치용 SQLite
+from __future__ import annotations
+import datetime as dt
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from app.locator import ANCHOR_DATE
+
+SIZES = (1_000, 10_000, 100_000)
+
+def make_history(n: int, seed: int = 0) -> List[dict]:
+    """같은 (n, seed)면 항상 같은 이력. 번호 6개 + 보너스 1개는 균등 비복원."""
+    rng = np.random.default_rng(seed)
+    picks = np.argpartition(rng.random((n, 45)), 7, axis=1)[:, :7] + 1
+    nums = np.sort(picks[:, :6], axis=1).tolist()
+    bonus = picks[:, 6].tolist()
+    start = ANCHOR_DATE.toordinal()
+    return [{"draw_no": i + 1, "numbers": nums[i], "bonus": int(bonus[i]),
+             "date": dt.date.fromordinal(start + 7 * i).isoformat()} for i in range(n)]
+
+def write_db(draws: List[dict], path: Optional[Path] = None) -> Path:
+    """합성 이력으로 새 DB 생성(이전 JSON 이관은 건너뛰도록 'migrated' 표시)."""
+    from app import storage      # DRAWS_DB를 먼저 정할 수 있게 늦게 import
+    path = Path(path or Path(tempfile.mkdtemp(prefix="lotto-bench-")) / "draws.sqlite3")
+    conn = storage.connect(path)
+    storage.set_meta("migrated", 0, conn=conn)
+    storage.upsert_many(draws, conn=conn)
+    conn.close()
+    return path
@@ -0,0 +1,21 @@
+# bench/timing.py — 측정 도우미(밀리초, 중앙값·최솟값)
+from __future__ import annotations
+import time
+from typing import Callable, Dict, List
+
+def percentile(samples: List[float], q: float) -> float:
+    s = sorted(samples)
+    if not s: return 0.0
+    i = min(len(s) - 1, max(0, int(round(q / 100.0 * (len(s) - 1)))))
+    return s[i]
+
+def measure(fn: Callable[[], object], repeat: int = 5, warmup: int = 1, budget: float = 2.0) -> Dict[str, float]:
+    """fn을 repeat회(시간 예산 budget초 안에서) 실행한 ms 통계."""
+    for _ in range(warmup): fn()
+    samples: List[float] = []
+    t_end = time.perf_counter() + budget
+    while len(samples) < repeat and (not samples or time.perf_counter() < t_end):
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1000.0)
+    return {"ms_p50": round(percentile(samples, 50), 3), "ms_min": round(min(samples), 3), "runs": len(samples)}
@@ -10,12 +10,8 @@ window.addEventListener('error', (e) => {
 // ===== API =====
 const api = {
   async predict() {
-    const url = `/api/predict?u=${Date.now()}`; // 캐시 회피 (매 클릭 재조회)
-    const r = await fetch(url, {
-      method: 'POST',
-      cache: 'no-store',
-      headers: { 'Cache-Control': 'no-store' }
-    });
+    // 같은 회차 데이터면 결과가 같으므로 HTTP 캐시(ETag/304) 활용
+    const r = await fetch('/api/predict', { method: 'GET' });
     if (!r.ok) throw new Error(await r.text());
     return r.json();
   }
@@ -70,8 +66,6 @@ function renderBestTop5FromBestStrategy(allBy) {
     </div>
   `).join('');
 }
-const url = `/api/predict?u=${Date.now()}`; // 캐시 회피
-fetch(url, { method: 'POST', cache: 'no-store', headers: { 'Cache-Control': 'no-store' }})
 
 // ② 이번 주 추천 전략 (각 전략 1세트, 점수 내림차순 → 카드 세로)
 function renderWeekly(best3) {
@@ -126,16 +120,20 @@ function renderByStrategy(allBy) {
 document.addEventListener('DOMContentLoaded', () => {
   const statusEl = $('#apiStatus');
 
+  function renderAll(data) {
+    // ① 단일 ‘최고’ 전략 Top5
+    renderBestTop5FromBestStrategy(data.all_by_strategy_korean);
+    // ② 이번 주 추천 전략
+    renderWeekly(data.best3_by_priority_korean);
+    // ③ 전략별 추천(보수형 → 전략형 → 고위험형 가로 배치)
+    renderByStrategy(data.all_by_strategy_korean);
+  }
+
   async function runPredict() {
     statusEl && (statusEl.textContent = '계산 중…');
     try {
-      const data = await api.predict(); // 매 클릭마다 새 요청
-      // ① 단일 ‘최고’ 전략 Top5
-      renderBestTop5FromBestStrategy(data.all_by_strategy_korean);
-      // ② 이번 주 추천 전략
-      renderWeekly(data.best3_by_priority_korean);
-      // ③ 전략별 추천(보수형 → 전략형 → 고위험형 가로 배치)
-      renderByStrategy(data.all_by_strategy_korean);
+      const data = await api.predict(); // 매 클릭마다 조회(변경 없으면 304)
+      renderAll(data);
       statusEl && (statusEl.textContent = '완료');
     } catch (e) {
       console.error(e);
@@ -144,4 +142,19 @@ document.addEventListener('DOMContentLoaded', () => {
   }
 
   $('#btnPredict')?.addEventListener('click', runPredict); // 클릭할 때마다 재조회
+
+  // 새 회차 알림(SSE): 폴링 없이 서버가 새 회차 + 예측을 보내줌(끊기면 브라우저가 Last-Event-ID로 재연결)
+  if (window.EventSource) {
+    let seen = 0;
+    const es = new EventSource('/api/stream/draws');
+    es.addEventListener('draw', (ev) => {
+      const msg = JSON.parse(ev.data);
+      const no = msg.draw?.draw_no ?? 0;
+      if (seen && no > seen && msg.prediction) {
+        renderAll(msg.prediction);
+        statusEl && (statusEl.textContent = `${no}회 추첨 반영`);
+      }
+      seen = Math.max(seen, no);
+    });
+  }
 });